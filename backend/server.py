@@ -1,20 +1,40 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Header, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field, EmailStr, ValidationError
+from typing import List, Optional, Dict, Tuple, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from abc import ABC, abstractmethod
+from urllib.parse import quote
 import uuid
 from datetime import datetime, timedelta
 from enum import Enum
+import asyncio
 import base64
+import codecs
+import csv
+import hashlib
+import io
+import ipaddress
+import itertools
 import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -28,6 +48,53 @@ db = client[os.environ['DB_NAME']]
 SECRET_KEY = "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+
+# Login/register rate limiting ("memory" or "redis"); buckets refill to capacity over a minute
+AUTH_RATE_LIMIT_BACKEND = os.environ.get('AUTH_RATE_LIMIT_BACKEND', 'memory')
+AUTH_RATE_LIMIT_REDIS_URL = os.environ.get('AUTH_RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+AUTH_RATE_LIMIT_PER_IP = int(os.environ.get('AUTH_RATE_LIMIT_PER_IP', 30))
+AUTH_RATE_LIMIT_PER_EMAIL = int(os.environ.get('AUTH_RATE_LIMIT_PER_EMAIL', 10))
+AUTH_RATE_LIMIT_MAX_KEYS = 50000
+# Peers whose X-Forwarded-For is believed; comma-separated addresses or CIDR ranges. Only loopback by
+# default: deployments behind an ingress must list its addresses, or clients could pick their own bucket
+AUTH_TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy.strip(), strict=False)
+    for proxy in os.environ.get('AUTH_TRUSTED_PROXIES', '127.0.0.1,::1').split(',')
+    if proxy.strip()
+]
+
+# Catalog search: shorter queries match name prefixes instead of the text index
+SEARCH_MIN_TEXT_QUERY_LENGTH = 3
+SUGGEST_INDEX_MAX_AGE_SECONDS = int(os.environ.get('SUGGEST_INDEX_MAX_AGE_SECONDS', 300))
+SUGGEST_MAX_PREFIX_LENGTH = 12
+SUGGEST_MIN_TRIGRAM_SIMILARITY = 0.35
+
+# Booking numbers are short and random; inserts renumber and retry on a collision this many times
+BOOKING_INSERT_ATTEMPTS = 3
+
+# Result file storage ("gridfs" or "local")
+RESULT_STORAGE_BACKEND = os.environ.get('RESULT_STORAGE_BACKEND', 'gridfs')
+RESULT_STORAGE_DIR = Path(os.environ.get('RESULT_STORAGE_DIR', ROOT_DIR / 'result_files'))
+RESULT_FILE_CHUNK_SIZE = 256 * 1024
+
+# Bulk test pricing import/export
+PRICING_IMPORT_CHUNK_SIZE = 1000
+PRICING_IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# USD to LRD exchange rate, used until an admin records one; other workers' changes are picked up after the max age
+DEFAULT_LRD_PER_USD = float(os.environ.get('DEFAULT_LRD_PER_USD', 190))
+EXCHANGE_RATE_MAX_AGE_SECONDS = int(os.environ.get('EXCHANGE_RATE_MAX_AGE_SECONDS', 60))
+REPRICE_BATCH_SIZE = 1000
+
+# Public catalog cache
+CATALOG_CACHE_TTL_SECONDS = int(os.environ.get('CATALOG_CACHE_TTL_SECONDS', 300))
+CATALOG_CACHE_MAX_ENTRIES = 5000
+CATALOG_CACHE_CONTROL = "public, no-cache"
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = 10000
+TOKEN_REVOKING_USER_FIELDS = ["role", "email", "is_active", "password"]
+TOKEN_REVOCATION_MAX_AGE_SECONDS = int(os.environ.get('TOKEN_REVOCATION_MAX_AGE_SECONDS', 10))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -53,6 +120,25 @@ class BookingStatus(str, Enum):
     COMPLETED = "completed"
     CANCELLED = "cancelled"
 
+BOOKING_STATUS_VALUES = {booking_status.value for booking_status in BookingStatus}
+
+# Bookings move forward through the workflow (steps may be skipped) or get cancelled;
+# completed and cancelled bookings are final
+BOOKING_STATUS_TRANSITIONS: Dict[BookingStatus, List[BookingStatus]] = {
+    BookingStatus.PENDING: [
+        BookingStatus.CONFIRMED, BookingStatus.SAMPLE_COLLECTED, BookingStatus.RESULTS_READY,
+        BookingStatus.COMPLETED, BookingStatus.CANCELLED
+    ],
+    BookingStatus.CONFIRMED: [
+        BookingStatus.SAMPLE_COLLECTED, BookingStatus.RESULTS_READY, BookingStatus.COMPLETED,
+        BookingStatus.CANCELLED
+    ],
+    BookingStatus.SAMPLE_COLLECTED: [BookingStatus.RESULTS_READY, BookingStatus.COMPLETED, BookingStatus.CANCELLED],
+    BookingStatus.RESULTS_READY: [BookingStatus.COMPLETED, BookingStatus.CANCELLED],
+    BookingStatus.COMPLETED: [],
+    BookingStatus.CANCELLED: [],
+}
+
 class DeliveryMethod(str, Enum):
     WHATSAPP = "whatsapp"
     IN_PERSON = "in_person"
@@ -65,6 +151,25 @@ class Language(str, Enum):
     EN = "en"
     FR = "fr"
 
+class TimeseriesMetric(str, Enum):
+    BOOKINGS = "bookings"
+    REVENUE = "revenue"
+    COMPLETED_REVENUE = "completed_revenue"
+
+class TimeseriesInterval(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class TimeseriesGroup(str, Enum):
+    CLINIC = "clinic"
+    TEST = "test"
+    CURRENCY = "currency"
+
+class PricingFileFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
 # Models
 class UserBase(BaseModel):
     email: EmailStr
@@ -91,6 +196,13 @@ class Token(BaseModel):
     token_type: str
     user: User
 
+class Principal(BaseModel):
+    """Who is calling, as carried in the access token claims"""
+    id: str
+    role: UserRole
+    clinic_id: Optional[str] = None  # Clinic operated by a clinic-side user
+    token_version: int = 0
+
 class TestBase(BaseModel):
     name: str
     description: str
@@ -131,7 +243,7 @@ class TestPricingBase(BaseModel):
     test_id: str
     clinic_id: str
     price_usd: float
-    price_lrd: float
+    price_lrd: Optional[float] = None  # None derives LRD from price_usd at the current exchange rate
     is_available: bool = True
 
 class TestPricingCreate(TestPricingBase):
@@ -142,6 +254,66 @@ class TestPricing(TestPricingBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class PricingImportError(BaseModel):
+    row: int  # Line number in the uploaded file
+    error: str
+
+class PricingImportReport(BaseModel):
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: List[PricingImportError] = []  # First PRICING_IMPORT_MAX_REPORTED_ERRORS only
+
+class ExchangeRateCreate(BaseModel):
+    rate: float = Field(gt=0)  # LRD per USD
+    reprice_overrides: bool = False  # Also scale rows with their own price_lrd by the rate change
+
+class LrdOverrideClear(BaseModel):
+    rate: Optional[float] = Field(None, gt=0)  # Rate the stored LRD prices were entered at; defaults to the current one
+    tolerance: float = Field(0.0, ge=0, le=0.5)  # Relative difference still treated as derived, e.g. 0.01 for 1%
+
+class ExchangeRate(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    base_currency: Currency = Currency.USD
+    quote_currency: Currency = Currency.LRD
+    rate: float
+    created_by: Optional[str] = None
+    effective_at: datetime = Field(default_factory=datetime.utcnow)
+
+class TestProviderOption(BaseModel):
+    """One clinic offering a test, as stored in the test_providers view"""
+    clinic_id: str
+    name: str
+    description: str
+    location: str
+    phone: str
+    rating: float = 0.0
+    total_reviews: int = 0
+    pricing_id: str
+    price_usd: float
+    price_lrd: Optional[float] = None
+
+class TestProviderOptions(BaseModel):
+    test_id: str
+    currency: Currency
+    providers: List[TestProviderOption]  # Cheapest first in the requested currency
+
+class ClinicTestListing(BaseModel):
+    test: Test
+    pricing: TestPricing
+
+class ClinicTestCatalog(BaseModel):
+    clinic: Clinic
+    tests: List[ClinicTestListing]
+
+class ResultFile(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    filename: str
+    content_type: Optional[str] = None
+    length: int = 0
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
+
 class BookingBase(BaseModel):
     patient_name: str
     patient_phone: str
@@ -157,16 +329,100 @@ class BookingBase(BaseModel):
 class BookingCreate(BookingBase):
     pass
 
+def new_booking_number() -> str:
+    return f"CHK-{uuid.uuid4().hex[:8].upper()}"
+
 class Booking(BookingBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    booking_number: str = Field(default_factory=lambda: f"CHK-{uuid.uuid4().hex[:8].upper()}")
+    booking_number: str = Field(default_factory=new_booking_number)
     status: BookingStatus = BookingStatus.PENDING
     total_amount: float = 0.0
     assigned_to: Optional[str] = None
-    result_files: List[str] = []
+    test_prices: Dict[str, float] = {}  # Price of each test when booked, in preferred_currency
+    result_files: List[ResultFile] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class CartItem(BaseModel):
+    test_id: str
+    clinic_id: str
+
+class CartCheckout(BaseModel):
+    patient_name: str
+    patient_phone: str
+    patient_email: Optional[EmailStr] = None
+    patient_location: str
+    delivery_method: DeliveryMethod
+    preferred_currency: Currency = Currency.USD
+    delivery_charge: float = 0.0  # Charged once per checkout, on the first provider's booking
+    notes: Optional[str] = None
+    items: List[CartItem] = Field(min_length=1, max_length=100)
+
+class CartCheckoutResult(BaseModel):
+    booking_numbers: List[str]
+    total_amount: float
+    bookings: List[Booking]
+
+class BookingSummary(BaseModel):
+    """Table-row view of a booking; never carries result file metadata"""
+    id: str
+    booking_number: str
+    patient_name: str
+    patient_phone: str
+    patient_location: str
+    test_ids: List[str]
+    clinic_id: str
+    delivery_method: DeliveryMethod
+    preferred_currency: Currency = Currency.USD
+    status: BookingStatus = BookingStatus.PENDING
+    total_amount: float = 0.0
+    assigned_to: Optional[str] = None
+    result_files_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+BOOKING_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "booking_number": 1,
+    "patient_name": 1,
+    "patient_phone": 1,
+    "patient_location": 1,
+    "test_ids": 1,
+    "clinic_id": 1,
+    "delivery_method": 1,
+    "preferred_currency": 1,
+    "status": 1,
+    "total_amount": 1,
+    "assigned_to": 1,
+    "result_files_count": {"$size": {"$ifNull": ["$result_files", []]}},
+    "created_at": 1,
+    "updated_at": 1
+}
+
+class BookingStatusUpdate(BaseModel):
+    status: BookingStatus
+
+class BookingBulkUpdate(BaseModel):
+    booking_ids: List[str] = Field(min_length=1, max_length=500)
+    status: Optional[BookingStatus] = None
+    assigned_to: Optional[str] = None  # Admin or sub-admin handling the bookings; an explicit null unassigns them
+
+class BookingUpdateResult(BaseModel):
+    booking_id: str
+    success: bool
+    previous_status: Optional[str] = None
+    error: Optional[str] = None
+
+class BookingBulkUpdateResult(BaseModel):
+    updated: int
+    results: List[BookingUpdateResult]
+
+class BookingPage(BaseModel):
+    bookings: List[BookingSummary]
+    next_cursor: Optional[str] = None
+    status_counts: Optional[Dict[str, int]] = None  # Only on the first page
+
 class FeedbackBase(BaseModel):
     booking_id: str
     rating: int = Field(ge=1, le=5)
@@ -178,8 +434,29 @@ class FeedbackCreate(FeedbackBase):
 
 class Feedback(FeedbackBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    clinic_id: Optional[str] = None
+    booking_number: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class FeedbackPage(BaseModel):
+    feedback: List[Feedback]
+    next_cursor: Optional[str] = None
+
+class TestSearchPage(BaseModel):
+    tests: List[Test]
+    next_offset: Optional[int] = None
+
+class ClinicSearchPage(BaseModel):
+    clinics: List[Clinic]
+    next_offset: Optional[int] = None
+
+class SearchSuggestion(BaseModel):
+    type: str  # "test" or "clinic"
+    id: str
+    label: str
+    detail: Optional[str] = None  # Category for tests, location for clinics
+    matched_field: str
+
 class SurgeryInquiryBase(BaseModel):
     patient_name: str
     patient_phone: str
@@ -204,6 +481,27 @@ class SurgeryInquiry(SurgeryInquiryBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class SurgeryInquirySummary(BaseModel):
+    """List view of a surgery inquiry; medical_report holds only name/type/size"""
+    id: str
+    inquiry_number: str
+    patient_name: str
+    patient_phone: str
+    patient_email: Optional[EmailStr] = None
+    surgery_type: str
+    medical_condition: str
+    preferred_hospital_location: str = "India"
+    budget_range: str
+    status: str = "pending"
+    hospital_details: Optional[str] = None
+    accommodation_details: Optional[str] = None
+    estimated_cost: Optional[str] = None
+    medical_report: Optional[dict] = None
+    created_at: datetime
+    updated_at: datetime
+
+SURGERY_INQUIRY_SUMMARY_PROJECTION = {"_id": 0, "notes": 0, "medical_report.data": 0}
+
 # Helper functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -215,11 +513,44 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-bounded thread pool so it never blocks the event loop"""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    async def run(self, func, *args):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.max_workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await password_hasher.run(pwd_context.hash, password)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
@@ -235,12 +566,24 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
-    user = await db.users.find_one({"id": user_id})
-    if user is None:
+    # Tokens carry role, clinic and version claims; only tokens issued before that,
+    # or for users changed since, are resolved against the database
+    revoked = await token_revocations.is_revoked(user_id)
+    if "ver" in payload and not revoked:
+        return Principal(
+            id=user_id,
+            role=payload.get("role"),
+            clinic_id=payload.get("clinic_id"),
+            token_version=payload["ver"]
+        )
+    
+    # A revoked user's principal cached here may predate a change made through another worker
+    principal = await load_principal(user_id, fresh=revoked)
+    if principal is None or principal.token_version != payload.get("ver", principal.token_version):
         raise credentials_exception
-    return User(**user)
+    return principal
 
-async def get_admin_user(current_user: User = Depends(get_current_user)):
+async def get_admin_user(current_user: Principal = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -248,9 +591,334 @@ async def get_admin_user(current_user: User = Depends(get_current_user)):
         )
     return current_user
 
+async def get_staff_user(current_user: Principal = Depends(get_current_user)):
+    if current_user.role not in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
+
+def encode_page_cursor(document: dict) -> str:
+    """Opaque keyset cursor pointing just past the given document in (created_at, id) order"""
+    raw = json.dumps({"created_at": document["created_at"].isoformat(), "id": document["id"]})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_page_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(data["created_at"]), data["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def after_page_cursor(query: dict, cursor: Optional[str]) -> dict:
+    """Restrict a newest-first query to documents after the given page cursor"""
+    if not cursor:
+        return query
+    created_at, document_id = decode_page_cursor(cursor)
+    return {"$and": [query, {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": document_id}}
+    ]}]}
+
+# Result file storage
+class ResultFileStorage(ABC):
+    """Blob store for booking result files; bookings only keep ResultFile metadata"""
+
+    @abstractmethod
+    async def save(self, file_id: str, upload: UploadFile, metadata: dict) -> int:
+        """Stream an upload into the store in chunks and return its length in bytes"""
+
+    @abstractmethod
+    async def open_range(self, file_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Return an iterator over bytes start..end (inclusive); raises FileNotFoundError"""
+
+    @abstractmethod
+    async def delete(self, file_id: str):
+        """Remove a stored file; missing files are ignored"""
+
+class GridFSResultFileStorage(ResultFileStorage):
+    def __init__(self, database):
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name="result_files")
+
+    async def save(self, file_id: str, upload: UploadFile, metadata: dict) -> int:
+        grid_in = self.bucket.open_upload_stream_with_id(
+            file_id, upload.filename, chunk_size_bytes=RESULT_FILE_CHUNK_SIZE, metadata=metadata
+        )
+        try:
+            while True:
+                chunk = await upload.read(RESULT_FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await grid_in.write(chunk)
+        except Exception:
+            await grid_in.abort()
+            raise
+        await grid_in.close()
+        return grid_in.length
+
+    async def open_range(self, file_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        try:
+            grid_out = await self.bucket.open_download_stream(file_id)
+        except NoFile:
+            raise FileNotFoundError(file_id)
+        grid_out.seek(start)
+
+        async def iterator():
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await grid_out.read(min(RESULT_FILE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+        return iterator()
+
+    async def delete(self, file_id: str):
+        try:
+            await self.bucket.delete(file_id)
+        except NoFile:
+            pass
+
+class LocalDiskResultFileStorage(ResultFileStorage):
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, file_id: str) -> Path:
+        return self.directory / Path(file_id).name
+
+    async def save(self, file_id: str, upload: UploadFile, metadata: dict) -> int:
+        await run_in_threadpool(self.directory.mkdir, parents=True, exist_ok=True)
+        path = self._path(file_id)
+        handle = await run_in_threadpool(open, path, "wb")
+        length = 0
+        try:
+            while True:
+                chunk = await upload.read(RESULT_FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await run_in_threadpool(handle.write, chunk)
+                length += len(chunk)
+        except Exception:
+            handle.close()
+            await run_in_threadpool(path.unlink, missing_ok=True)
+            raise
+        handle.close()
+        return length
+
+    async def open_range(self, file_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        handle = await run_in_threadpool(open, self._path(file_id), "rb")
+
+        async def iterator():
+            try:
+                await run_in_threadpool(handle.seek, start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await run_in_threadpool(handle.read, min(RESULT_FILE_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+            finally:
+                handle.close()
+
+        return iterator()
+
+    async def delete(self, file_id: str):
+        await run_in_threadpool(self._path(file_id).unlink, missing_ok=True)
+
+def get_result_file_storage() -> ResultFileStorage:
+    if RESULT_STORAGE_BACKEND == "local":
+        return LocalDiskResultFileStorage(RESULT_STORAGE_DIR)
+    return GridFSResultFileStorage(db)
+
+result_storage = get_result_file_storage()
+
+def attachment_disposition(filename: str) -> str:
+    """Content-Disposition with an ASCII fallback name and the UTF-8 name per RFC 6266"""
+    fallback = re.sub(r'[^\x20-\x7e]|["\\]', "_", filename) or "download"
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+async def migrate_legacy_result_files() -> int:
+    """Move base64 result files stored inside bookings into result storage, keeping ResultFile metadata"""
+    migrated = 0
+    legacy = db.bookings.find(
+        {"result_files.data": {"$exists": True}}, {"_id": 0, "id": 1, "result_files": 1, "updated_at": 1}
+    )
+    async for booking in legacy:
+        result_files, saved = [], []
+        try:
+            for entry in booking["result_files"]:
+                if "data" not in entry:
+                    result_files.append(entry)
+                    continue
+                result_file = ResultFile(
+                    filename=entry.get("filename") or "result",
+                    content_type=entry.get("content_type"),
+                    uploaded_at=booking.get("updated_at") or datetime.utcnow()
+                )
+                content = io.BytesIO(base64.b64decode(entry["data"]))
+                result_file.length = await result_storage.save(
+                    result_file.id,
+                    UploadFile(file=content, filename=result_file.filename),
+                    {"booking_id": booking["id"], "content_type": result_file.content_type}
+                )
+                saved.append(result_file.id)
+                result_files.append(result_file.dict())
+        except Exception as e:
+            logger.error(f"Could not migrate result files of booking {booking['id']}: {e}")
+            for file_id in saved:
+                await result_storage.delete(file_id)
+            continue
+
+        # Skip bookings whose results were replaced by a new upload in the meantime
+        result = await db.bookings.update_one(
+            {"id": booking["id"], "result_files.data": {"$exists": True}},
+            {"$set": {"result_files": result_files}}
+        )
+        if result.modified_count:
+            migrated += 1
+        else:
+            for file_id in saved:
+                await result_storage.delete(file_id)
+    return migrated
+
+def parse_range_header(range_header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """Parse a single 'bytes=start-end' Range header; None means serve the whole file"""
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text == "":
+            # Suffix range: the last N bytes
+            start = max(length - int(end_text), 0)
+            end = length - 1
+        else:
+            start = int(start_text)
+            end = min(int(end_text), length - 1) if end_text else length - 1
+    except ValueError:
+        return None
+
+    if start >= length or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"}
+        )
+    return start, end
+
+# Auth rate limiting
+class RateLimiter(ABC):
+    """Token buckets keyed by string; take() reports whether a request may proceed and when to retry"""
+
+    @abstractmethod
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        ...
+
+class InMemoryRateLimiter(RateLimiter):
+    """Per-process buckets; the stand-in used when no shared store is configured"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        allowed = tokens >= 1
+        self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        # Least recently used buckets go first; they are the likeliest to have refilled anyway
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        if not allowed:
+            return False, (1 - tokens) / refill_per_second
+        return True, 0.0
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets shared by every worker, updated atomically by a Lua script"""
+
+    TAKE_SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local tokens = math.min(capacity, (tonumber(bucket[1]) or capacity) + (now - (tonumber(bucket[2]) or now)) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # Optional dependency, only needed for this backend
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(self.TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        allowed, tokens = await self._take(
+            keys=[f"ratelimit:{key}"], args=[capacity, refill_per_second, time.time()]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (1 - float(tokens)) / refill_per_second
+
+def get_rate_limiter() -> RateLimiter:
+    if AUTH_RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(AUTH_RATE_LIMIT_REDIS_URL)
+    return InMemoryRateLimiter(AUTH_RATE_LIMIT_MAX_KEYS)
+
+auth_rate_limiter = get_rate_limiter()
+auth_rate_limit_counters: Dict[str, int] = {}
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in AUTH_TRUSTED_PROXIES)
+
+def get_client_ip(request: Request) -> str:
+    """The first address, walking X-Forwarded-For back from the peer, that is not a trusted proxy"""
+    client_ip = request.client.host if request.client else "unknown"
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    while forwarded and is_trusted_proxy(client_ip):
+        client_ip = forwarded.pop()
+    return client_ip
+
+async def enforce_auth_rate_limit(action: str, request: Request, email: str):
+    """Reject with 429 before any database or bcrypt work once the IP or email bucket is empty"""
+    client_ip = get_client_ip(request)
+    buckets = [
+        ("ip", client_ip, AUTH_RATE_LIMIT_PER_IP),
+        ("email", email.lower(), AUTH_RATE_LIMIT_PER_EMAIL)
+    ]
+    for scope, value, per_minute in buckets:
+        allowed, retry_after = await auth_rate_limiter.take(f"{action}:{scope}:{value}", per_minute, per_minute / 60)
+        if not allowed:
+            counter = f"{action}_rejected_by_{scope}"
+            auth_rate_limit_counters[counter] = auth_rate_limit_counters.get(counter, 0) + 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please try again later",
+                headers={"Retry-After": str(max(1, round(retry_after)))}
+            )
+    counter = f"{action}_allowed"
+    auth_rate_limit_counters[counter] = auth_rate_limit_counters.get(counter, 0) + 1
+
 # Auth endpoints
 @api_router.post("/auth/register", response_model=User)
-async def register_user(user_data: UserCreate):
+async def register_user(user_data: UserCreate, request: Request):
+    await enforce_auth_rate_limit("register", request, user_data.email)
+    
     # Check if user already exists
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
@@ -260,7 +928,7 @@ async def register_user(user_data: UserCreate):
         )
     
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     # Create user
     user_dict = user_data.dict()
@@ -275,35 +943,219 @@ async def register_user(user_data: UserCreate):
     return user_obj
 
 @api_router.post("/auth/login", response_model=Token)
-async def login_user(user_data: UserLogin):
+async def login_user(user_data: UserLogin, request: Request):
+    await enforce_auth_rate_limit("login", request, user_data.email)
+    
     # Find user
     user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user['password']):
+    if not user or not await verify_password(user_data.password, user['password']):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
     # Create access token
+    principal = await principal_from_user(user)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user['id']}, expires_delta=access_token_expires
+        data={
+            "sub": principal.id,
+            "role": principal.role.value,
+            "clinic_id": principal.clinic_id,
+            "ver": principal.token_version
+        },
+        expires_delta=access_token_expires
     )
     
     user_obj = User(**user)
     return Token(access_token=access_token, token_type="bearer", user=user_obj)
 
+# Catalog cache
+class TTLCache:
+    """In-process cache whose entries expire after ttl_seconds, with hit/miss counters"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: Dict[str, Tuple[float, object]] = {}
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value, generation: int):
+        # A load that started before an invalidation must not repopulate stale data
+        if generation != self.generation:
+            return
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            self._entries = {k: entry for k, entry in self._entries.items() if entry[0] > now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(min(self._entries, key=lambda k: self._entries[k][0]))
+        self._entries[key] = (now + self.ttl_seconds, value)
+
+    def invalidate(self, *keys: str):
+        self.generation += 1
+        for key in keys or list(self._entries):
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds
+        }
+
+catalog_cache = TTLCache(CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_MAX_ENTRIES)
+
+# Principal cache: the caller's role, clinic and token version, keyed by user id
+principal_cache = TTLCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+# Users whose role, clinic or token version changed while their tokens may still be live; a TTL index
+# empties token_revocations once those tokens expire, other workers' entries are picked up after the max age
+class TokenRevocations:
+
+    def __init__(self):
+        self.expires_at: Dict[str, datetime] = {}
+        self.loaded_at = 0.0
+
+    async def load(self):
+        revocations = await db.token_revocations.find(
+            {"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 0, "user_id": 1, "expires_at": 1}
+        ).to_list(None)
+        self.expires_at = {revocation["user_id"]: revocation["expires_at"] for revocation in revocations}
+        self.loaded_at = time.monotonic()
+
+    async def revoke(self, user_id: str):
+        expires_at = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        await db.token_revocations.update_one(
+            {"user_id": user_id}, {"$set": {"expires_at": expires_at}}, upsert=True
+        )
+        self.expires_at[user_id] = expires_at
+
+    async def is_revoked(self, user_id: str) -> bool:
+        if time.monotonic() - self.loaded_at > TOKEN_REVOCATION_MAX_AGE_SECONDS:
+            self.loaded_at = time.monotonic()  # Concurrent requests keep the current set meanwhile
+            await self.load()
+        expires_at = self.expires_at.get(user_id)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self.expires_at),
+            "loaded_seconds_ago": round(time.monotonic() - self.loaded_at, 1),
+            "max_age_seconds": TOKEN_REVOCATION_MAX_AGE_SECONDS
+        }
+
+token_revocations = TokenRevocations()
+
+async def principal_from_user(user: dict) -> Principal:
+    clinic = None
+    if user.get("role") not in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
+        clinic = await db.clinics.find_one({"user_id": user["id"]}, {"id": 1})
+    return Principal(
+        id=user["id"],
+        role=user["role"],
+        clinic_id=clinic["id"] if clinic else None,
+        token_version=user.get("token_version", 0)
+    )
+
+async def load_principal(user_id: str, fresh: bool = False) -> Optional[Principal]:
+    principal = None if fresh else principal_cache.get(user_id)
+    if principal is None:
+        generation = principal_cache.generation
+        user = await db.users.find_one({"id": user_id}, {"id": 1, "role": 1, "token_version": 1})
+        if user is None:
+            return None
+        principal = await principal_from_user(user)
+        principal_cache.set(user_id, principal, generation)
+    return principal
+
+async def mark_principal_changed(*user_ids: str):
+    """Stop trusting token claims for these users; their next requests re-check the database"""
+    for user_id in filter(None, user_ids):
+        principal_cache.invalidate(user_id)
+        await token_revocations.revoke(user_id)
+
+def ensure_booking_access(current_user: Principal, booking: dict):
+    """Clinic-side users may only act on bookings assigned to their own clinic"""
+    if current_user.role not in [UserRole.ADMIN, UserRole.SUB_ADMIN] and booking["clinic_id"] != current_user.clinic_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+async def load_tests_catalog() -> List[Test]:
+    tests = await db.tests.find().to_list(1000)
+    return [Test(**test) for test in tests]
+
+async def load_clinics_catalog() -> List[Clinic]:
+    clinics = await db.clinics.find().to_list(1000)
+    return [Clinic(**clinic) for clinic in clinics]
+
+async def get_cached_json(key: str, loader) -> Tuple[str, bytes]:
+    """(ETag, JSON body) for a cacheable response, loaded only when missing or expired"""
+    entry = catalog_cache.get(key)
+    if entry is None:
+        generation = catalog_cache.generation
+        body = json.dumps(jsonable_encoder(await loader())).encode()
+        entry = ('"' + hashlib.sha256(body).hexdigest()[:32] + '"', body)
+        catalog_cache.set(key, entry, generation)
+    return entry
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+async def catalog_response(key: str, loader, if_none_match: Optional[str] = None) -> Response:
+    """Cached catalog response; answers 304 when the client already holds the current ETag"""
+    etag, body = await get_cached_json(key, loader)
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@api_router.get("/cache/stats")
+async def get_cache_stats(current_user: Principal = Depends(get_admin_user)):
+    return {
+        "catalog": catalog_cache.stats(),
+        "principal": principal_cache.stats(),
+        "token_revocations": token_revocations.stats()
+    }
+
+@api_router.get("/auth/hashing/stats")
+async def get_password_hashing_stats(current_user: Principal = Depends(get_admin_user)):
+    return password_hasher.stats()
+
+@api_router.get("/auth/rate-limit/stats")
+async def get_auth_rate_limit_stats(current_user: Principal = Depends(get_admin_user)):
+    return {
+        "backend": AUTH_RATE_LIMIT_BACKEND,
+        "per_ip_per_minute": AUTH_RATE_LIMIT_PER_IP,
+        "per_email_per_minute": AUTH_RATE_LIMIT_PER_EMAIL,
+        "counters": auth_rate_limit_counters
+    }
+
 # Test management endpoints
 @api_router.post("/tests", response_model=Test)
-async def create_test(test_data: TestCreate, current_user: User = Depends(get_admin_user)):
+async def create_test(test_data: TestCreate, current_user: Principal = Depends(get_admin_user)):
     test_obj = Test(**test_data.dict())
     await db.tests.insert_one(test_obj.dict())
+    catalog_cache.invalidate("tests")
+    suggestion_index.add("test", test_obj.dict())
     return test_obj
 
 @api_router.get("/tests", response_model=List[Test])
 async def get_tests():
-    tests = await db.tests.find().to_list(1000)
-    return [Test(**test) for test in tests]
+    etag, body = await get_cached_json("tests", load_tests_catalog)
+    return Response(content=body, media_type="application/json")
 
 @api_router.get("/tests/{test_id}", response_model=Test)
 async def get_test(test_id: str):
@@ -313,35 +1165,43 @@ async def get_test(test_id: str):
     return Test(**test)
 
 @api_router.put("/tests/{test_id}", response_model=Test)
-async def update_test(test_id: str, test_data: TestCreate, current_user: User = Depends(get_admin_user)):
+async def update_test(test_id: str, test_data: TestCreate, current_user: Principal = Depends(get_admin_user)):
     update_data = test_data.dict()
     update_data['updated_at'] = datetime.utcnow()
     
     result = await db.tests.update_one({"id": test_id}, {"$set": update_data})
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Test not found")
+    catalog_cache.invalidate("tests")
     
     updated_test = await db.tests.find_one({"id": test_id})
+    suggestion_index.add("test", updated_test)
     return Test(**updated_test)
 
 @api_router.delete("/tests/{test_id}")
-async def delete_test(test_id: str, current_user: User = Depends(get_admin_user)):
+async def delete_test(test_id: str, current_user: Principal = Depends(get_admin_user)):
     result = await db.tests.delete_one({"id": test_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Test not found")
+    await db.test_providers.delete_one({"test_id": test_id})
+    catalog_cache.invalidate("tests")
+    suggestion_index.remove("test", test_id)
     return {"message": "Test deleted successfully"}
 
 # Clinic management endpoints
 @api_router.post("/clinics", response_model=Clinic)
-async def create_clinic(clinic_data: ClinicCreate, current_user: User = Depends(get_admin_user)):
+async def create_clinic(clinic_data: ClinicCreate, current_user: Principal = Depends(get_admin_user)):
     clinic_obj = Clinic(**clinic_data.dict())
     await db.clinics.insert_one(clinic_obj.dict())
+    catalog_cache.invalidate()
+    await mark_principal_changed(clinic_obj.user_id)
+    suggestion_index.add("clinic", clinic_obj.dict())
     return clinic_obj
 
 @api_router.get("/clinics", response_model=List[Clinic])
 async def get_clinics():
-    clinics = await db.clinics.find().to_list(1000)
-    return [Clinic(**clinic) for clinic in clinics]
+    etag, body = await get_cached_json("clinics", load_clinics_catalog)
+    return Response(content=body, media_type="application/json")
 
 @api_router.get("/clinics/{clinic_id}", response_model=Clinic)
 async def get_clinic(clinic_id: str):
@@ -351,27 +1211,138 @@ async def get_clinic(clinic_id: str):
     return Clinic(**clinic)
 
 @api_router.put("/clinics/{clinic_id}", response_model=Clinic)
-async def update_clinic(clinic_id: str, clinic_data: ClinicCreate, current_user: User = Depends(get_admin_user)):
+async def update_clinic(clinic_id: str, clinic_data: ClinicCreate, current_user: Principal = Depends(get_admin_user)):
     update_data = clinic_data.dict()
     update_data['updated_at'] = datetime.utcnow()
     
-    result = await db.clinics.update_one({"id": clinic_id}, {"$set": update_data})
-    if result.modified_count == 0:
+    previous_clinic = await db.clinics.find_one_and_update({"id": clinic_id}, {"$set": update_data})
+    if not previous_clinic:
         raise HTTPException(status_code=404, detail="Clinic not found")
+    await refresh_clinic_test_providers(clinic_id)
+    catalog_cache.invalidate()
+    if previous_clinic.get("user_id") != update_data["user_id"]:
+        await mark_principal_changed(previous_clinic.get("user_id"), update_data["user_id"])
     
     updated_clinic = await db.clinics.find_one({"id": clinic_id})
+    suggestion_index.add("clinic", updated_clinic)
     return Clinic(**updated_clinic)
 
 @api_router.delete("/clinics/{clinic_id}")
-async def delete_clinic(clinic_id: str, current_user: User = Depends(get_admin_user)):
-    result = await db.clinics.delete_one({"id": clinic_id})
-    if result.deleted_count == 0:
+async def delete_clinic(clinic_id: str, current_user: Principal = Depends(get_admin_user)):
+    clinic = await db.clinics.find_one_and_delete({"id": clinic_id})
+    if not clinic:
         raise HTTPException(status_code=404, detail="Clinic not found")
+    await refresh_clinic_test_providers(clinic_id)
+    catalog_cache.invalidate()
+    await mark_principal_changed(clinic.get("user_id"))
+    suggestion_index.remove("clinic", clinic_id)
     return {"message": "Clinic deleted successfully"}
 
+# Exchange rates: history in exchange_rates, the current rate held in memory
+class ExchangeRateHolder:
+    def __init__(self, default_rate: float):
+        self.rate = default_rate
+        self.effective_at: Optional[datetime] = None
+        self.loaded_at = 0.0
+
+    async def load(self):
+        latest = await db.exchange_rates.find_one({}, {"_id": 0}, sort=[("effective_at", DESCENDING)])
+        if latest and latest["rate"] != self.rate:
+            # Cached catalog responses embed LRD prices derived from the old rate
+            catalog_cache.invalidate()
+        if latest:
+            self.rate = latest["rate"]
+            self.effective_at = latest["effective_at"]
+        self.loaded_at = time.monotonic()
+
+current_exchange_rate = ExchangeRateHolder(DEFAULT_LRD_PER_USD)
+
+async def get_lrd_rate() -> float:
+    if time.monotonic() - current_exchange_rate.loaded_at > EXCHANGE_RATE_MAX_AGE_SECONDS:
+        current_exchange_rate.loaded_at = time.monotonic()  # Concurrent requests keep the current rate meanwhile
+        await current_exchange_rate.load()
+    return current_exchange_rate.rate
+
+def with_lrd_price(pricing: dict, rate: float) -> dict:
+    """Fill in price_lrd from the exchange rate for rows that don't set their own"""
+    if pricing.get("price_lrd") is None:
+        pricing["price_lrd"] = round(pricing["price_usd"] * rate, 2)
+    return pricing
+
+async def reprice_lrd_overrides(ratio: float) -> int:
+    """Scale every stored price_lrd by ratio, REPRICE_BATCH_SIZE rows per update"""
+    repriced = 0
+    last_id = ""
+    while True:
+        batch = await db.test_pricing.find(
+            {"price_lrd": {"$ne": None}, "id": {"$gt": last_id}}, {"_id": 0, "id": 1}
+        ).sort("id", ASCENDING).limit(REPRICE_BATCH_SIZE).to_list(REPRICE_BATCH_SIZE)
+        if not batch:
+            return repriced
+        last_id = batch[-1]["id"]
+        result = await db.test_pricing.update_many(
+            {"id": {"$in": [pricing["id"] for pricing in batch]}},
+            [{"$set": {"price_lrd": {"$round": [{"$multiply": ["$price_lrd", ratio]}, 2]}}}]
+        )
+        repriced += result.modified_count
+
+@api_router.get("/exchange-rates/current", response_model=ExchangeRate)
+async def get_current_exchange_rate():
+    rate = await get_lrd_rate()
+    return ExchangeRate(rate=rate, effective_at=current_exchange_rate.effective_at or datetime.utcnow())
+
+@api_router.get("/exchange-rates", response_model=List[ExchangeRate])
+async def get_exchange_rate_history(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Principal = Depends(get_admin_user)
+):
+    rates = await db.exchange_rates.find({}, {"_id": 0}).sort("effective_at", DESCENDING).to_list(limit)
+    return [ExchangeRate(**rate) for rate in rates]
+
+@api_router.post("/exchange-rates")
+async def set_exchange_rate(rate_data: ExchangeRateCreate, current_user: Principal = Depends(get_admin_user)):
+    """Record a new USD to LRD rate; derived LRD prices follow it without touching pricing rows"""
+    # Another worker may have recorded a rate since this one last loaded it
+    latest = await db.exchange_rates.find_one({}, {"_id": 0, "rate": 1}, sort=[("effective_at", DESCENDING)])
+    previous_rate = latest["rate"] if latest else DEFAULT_LRD_PER_USD
+    exchange_rate = ExchangeRate(rate=rate_data.rate, created_by=current_user.id)
+    await db.exchange_rates.insert_one(exchange_rate.dict())
+    current_exchange_rate.rate = exchange_rate.rate
+    current_exchange_rate.effective_at = exchange_rate.effective_at
+
+    repriced = 0
+    if rate_data.reprice_overrides:
+        repriced = await reprice_lrd_overrides(exchange_rate.rate / previous_rate)
+        await refresh_test_providers()
+    catalog_cache.invalidate()
+    return {"exchange_rate": exchange_rate, "repriced_overrides": repriced}
+
+@api_router.post("/test-pricing/lrd-overrides/clear")
+async def clear_derivable_lrd_overrides(
+    clear_data: LrdOverrideClear, current_user: Principal = Depends(get_admin_user)
+):
+    """One-off conversion: drop price_lrd where it is just price_usd at the given rate, so it follows the rate"""
+    # Rows created while the pricing form required an LRD price all count as overrides otherwise
+    rate = clear_data.rate or await get_lrd_rate()
+    derived = {"$multiply": ["$price_usd", rate]}
+    result = await db.test_pricing.update_many(
+        {
+            "price_lrd": {"$ne": None},
+            "$expr": {"$lte": [
+                {"$abs": {"$subtract": ["$price_lrd", derived]}},
+                {"$max": [0.01, {"$multiply": [derived, clear_data.tolerance]}]}
+            ]}
+        },
+        {"$set": {"price_lrd": None, "updated_at": datetime.utcnow()}}
+    )
+    if result.modified_count:
+        await refresh_test_providers()
+        catalog_cache.invalidate()
+    return {"cleared_overrides": result.modified_count, "rate": rate}
+
 # Test pricing endpoints
 @api_router.post("/test-pricing", response_model=TestPricing)
-async def create_test_pricing(pricing_data: TestPricingCreate, current_user: User = Depends(get_admin_user)):
+async def create_test_pricing(pricing_data: TestPricingCreate, current_user: Principal = Depends(get_admin_user)):
     # Check if pricing already exists
     existing_pricing = await db.test_pricing.find_one({
         "test_id": pricing_data.test_id,
@@ -385,7 +1356,9 @@ async def create_test_pricing(pricing_data: TestPricingCreate, current_user: Use
     
     pricing_obj = TestPricing(**pricing_data.dict())
     await db.test_pricing.insert_one(pricing_obj.dict())
-    return pricing_obj
+    await refresh_test_providers([pricing_obj.test_id])
+    catalog_cache.invalidate()
+    return TestPricing(**with_lrd_price(pricing_obj.dict(), await get_lrd_rate()))
 
 @api_router.get("/test-pricing")
 async def get_test_pricing(test_id: str = None, clinic_id: str = None):
@@ -396,7 +1369,170 @@ async def get_test_pricing(test_id: str = None, clinic_id: str = None):
         query["clinic_id"] = clinic_id
     
     pricing = await db.test_pricing.find(query).to_list(1000)
-    return [TestPricing(**price) for price in pricing]
+    rate = await get_lrd_rate()
+    return [TestPricing(**with_lrd_price(price, rate)) for price in pricing]
+
+PRICING_FILE_FIELDS = ["test_id", "clinic_id", "price_usd", "price_lrd", "is_available"]
+
+def is_utf8_file(handle) -> bool:
+    """Check the whole upload decodes as UTF-8 before any row is written, then rewind it"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while True:
+            chunk = handle.read(RESULT_FILE_CHUNK_SIZE)
+            if not chunk:
+                decoder.decode(b"", final=True)
+                return True
+            decoder.decode(chunk)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        handle.seek(0)
+
+def read_pricing_rows(upload: UploadFile, file_format: PricingFileFormat):
+    """Yield (line number, raw row) from an uploaded CSV or NDJSON file without loading it whole"""
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if file_format == PricingFileFormat.CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Blank cells fall back to the model defaults
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+    else:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, e
+
+def describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+    )
+
+def record_import_error(report: PricingImportReport, row: int, error: str):
+    report.error_count += 1
+    if len(report.errors) < PRICING_IMPORT_MAX_REPORTED_ERRORS:
+        report.errors.append(PricingImportError(row=row, error=error))
+
+async def write_pricing_chunk(chunk: List[Tuple[int, TestPricingBase]], report: PricingImportReport) -> List[str]:
+    """Upsert one chunk of validated rows on (test_id, clinic_id); returns the test ids written"""
+    test_ids = {pricing.test_id for _, pricing in chunk}
+    clinic_ids = {pricing.clinic_id for _, pricing in chunk}
+    known_tests = set(await db.tests.distinct("id", {"id": {"$in": list(test_ids)}}))
+    known_clinics = set(await db.clinics.distinct("id", {"id": {"$in": list(clinic_ids)}}))
+
+    rows, written, operations = [], [], []
+    now = datetime.utcnow()
+    for line_number, pricing in chunk:
+        if pricing.test_id not in known_tests:
+            record_import_error(report, line_number, f"Unknown test_id {pricing.test_id}")
+        elif pricing.clinic_id not in known_clinics:
+            record_import_error(report, line_number, f"Unknown clinic_id {pricing.clinic_id}")
+        else:
+            rows.append(line_number)
+            written.append(pricing.test_id)
+            operations.append(UpdateOne(
+                {"test_id": pricing.test_id, "clinic_id": pricing.clinic_id},
+                {
+                    "$set": {
+                        "price_usd": pricing.price_usd,
+                        "price_lrd": pricing.price_lrd,
+                        "is_available": pricing.is_available,
+                        "updated_at": now
+                    },
+                    "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}
+                },
+                upsert=True
+            ))
+    if not operations:
+        return []
+
+    failed = set()
+    try:
+        result = (await db.test_pricing.bulk_write(operations, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+        for write_error in result["writeErrors"]:
+            failed.add(write_error["index"])
+            record_import_error(report, rows[write_error["index"]], write_error["errmsg"])
+    report.inserted += result["nUpserted"]
+    report.updated += result["nMatched"]
+    return list({test_id for index, test_id in enumerate(written) if index not in failed})
+
+@api_router.post("/test-pricing/import", response_model=PricingImportReport)
+async def import_test_pricing(
+    file: UploadFile = File(...),
+    file_format: PricingFileFormat = Query(PricingFileFormat.CSV, alias="format"),
+    current_user: Principal = Depends(get_admin_user)
+):
+    """Create or update pricing rows in bulk from a CSV or NDJSON file keyed by test_id and clinic_id"""
+    if not await run_in_threadpool(is_utf8_file, file.file):
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+
+    report = PricingImportReport()
+    touched_test_ids = set()
+    chunk: List[Tuple[int, TestPricingBase]] = []
+    rows = read_pricing_rows(file, file_format)
+    while True:
+        # Parse off the event loop, one chunk's worth of rows at a time
+        batch = await run_in_threadpool(list, itertools.islice(rows, PRICING_IMPORT_CHUNK_SIZE))
+        if not batch:
+            break
+        for line_number, row in batch:
+            report.processed += 1
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+                chunk.append((line_number, TestPricingBase(**row)))
+            except ValidationError as e:
+                record_import_error(report, line_number, describe_validation_error(e))
+            except ValueError as e:
+                record_import_error(report, line_number, f"Invalid row: {e}")
+            if len(chunk) >= PRICING_IMPORT_CHUNK_SIZE:
+                touched_test_ids.update(await write_pricing_chunk(chunk, report))
+                chunk = []
+    if chunk:
+        touched_test_ids.update(await write_pricing_chunk(chunk, report))
+
+    if touched_test_ids:
+        await refresh_test_providers(list(touched_test_ids))
+        catalog_cache.invalidate()
+    return report
+
+@api_router.get("/test-pricing/export")
+async def export_test_pricing(
+    file_format: PricingFileFormat = Query(PricingFileFormat.CSV, alias="format"),
+    current_user: Principal = Depends(get_admin_user)
+):
+    """Stream every pricing row in the same layout the import endpoint accepts"""
+    projection = {"_id": 0, **{field: 1 for field in PRICING_FILE_FIELDS}}
+
+    async def rows() -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=PRICING_FILE_FIELDS)
+        if file_format == PricingFileFormat.CSV:
+            writer.writeheader()
+        async for pricing in db.test_pricing.find({}, projection).sort([("test_id", 1), ("clinic_id", 1)]):
+            if file_format == PricingFileFormat.CSV:
+                writer.writerow(pricing)
+            else:
+                buffer.write(json.dumps(pricing) + "\n")
+            if buffer.tell() >= RESULT_FILE_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    media_type = "text/csv" if file_format == PricingFileFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="test_pricing.{file_format.value}"'}
+    )
 
 @api_router.get("/tests/{test_id}/pricing")
 async def get_test_pricing_by_test(test_id: str):
@@ -405,23 +1541,27 @@ async def get_test_pricing_by_test(test_id: str):
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    # Get pricing for this test
-    pricing = await db.test_pricing.find({"test_id": test_id, "is_available": True}).to_list(1000)
-    
-    # Get clinic details for each pricing
-    result = []
-    for price in pricing:
-        clinic = await db.clinics.find_one({"id": price["clinic_id"]})
-        if clinic:
-            result.append({
-                "test": Test(**test),
-                "clinic": Clinic(**clinic),
-                "pricing": TestPricing(**price)
-            })
+    # Join available pricing with its clinic in one round trip
+    pipeline = [
+        {"$match": {"test_id": test_id, "is_available": True}},
+        {"$lookup": {"from": "clinics", "localField": "clinic_id", "foreignField": "id", "as": "clinic"}},
+        {"$unwind": "$clinic"},
+        {"$project": {"_id": 0, "clinic._id": 0}}
+    ]
+    pricing = await db.test_pricing.aggregate(pipeline).to_list(1000)
+    rate = await get_lrd_rate()
     
-    return result
+    test_obj = Test(**test)
+    return [
+        {
+            "test": test_obj,
+            "clinic": Clinic(**price.pop("clinic")),
+            "pricing": TestPricing(**with_lrd_price(price, rate))
+        }
+        for price in pricing
+    ]
 
-@api_router.get("/clinics/{clinic_id}/tests")
+@api_router.get("/clinics/{clinic_id}/tests", response_model=ClinicTestCatalog)
 async def get_clinic_tests(clinic_id: str):
     # Get clinic details
     clinic = await db.clinics.find_one({"id": clinic_id})
@@ -431,186 +1571,660 @@ async def get_clinic_tests(clinic_id: str):
     # Get tests offered by this clinic
     pricing = await db.test_pricing.find({"clinic_id": clinic_id, "is_available": True}).to_list(1000)
     
-    # Get test details for each pricing
-    result = []
-    for price in pricing:
-        test = await db.tests.find_one({"id": price["test_id"]})
-        if test:
-            result.append({
-                "test": Test(**test),
-                "clinic": Clinic(**clinic),
-                "pricing": TestPricing(**price)
-            })
+    # Fetch every referenced test in one query
+    test_ids = list({price["test_id"] for price in pricing})
+    tests = await db.tests.find({"id": {"$in": test_ids}}).to_list(None)
+    tests_by_id = {test["id"]: Test(**test) for test in tests}
+    rate = await get_lrd_rate()
+    
+    return ClinicTestCatalog(
+        clinic=Clinic(**clinic),
+        tests=[
+            ClinicTestListing(test=tests_by_id[price["test_id"]], pricing=TestPricing(**with_lrd_price(price, rate)))
+            for price in pricing
+            if price["test_id"] in tests_by_id
+        ]
+    )
+
+# Cheapest providers view: one test_providers document per test, providers sorted by USD price
+async def refresh_test_providers(test_ids: Optional[List[str]] = None):
+    """Rebuild the view for the given tests, or for every test when test_ids is None"""
+    refreshed_at = datetime.utcnow()
+    match = {"is_available": True}
+    if test_ids is not None:
+        match["test_id"] = {"$in": test_ids}
+    await db.test_pricing.aggregate([
+        {"$match": match},
+        {"$lookup": {"from": "clinics", "localField": "clinic_id", "foreignField": "id", "as": "clinic"}},
+        {"$unwind": "$clinic"},
+        {"$sort": {"price_usd": 1, "price_lrd": 1}},
+        {"$group": {"_id": "$test_id", "providers": {"$push": {
+            "clinic_id": "$clinic.id",
+            "name": "$clinic.name",
+            "description": "$clinic.description",
+            "location": "$clinic.location",
+            "phone": "$clinic.phone",
+            "rating": "$clinic.rating",
+            "total_reviews": "$clinic.total_reviews",
+            "pricing_id": "$id",
+            "price_usd": "$price_usd",
+            "price_lrd": "$price_lrd"
+        }}}},
+        {"$project": {"_id": 0, "test_id": "$_id", "providers": 1, "refreshed_at": {"$literal": refreshed_at}}},
+        # Overlapping refreshes (workers starting together, an import beside a pricing edit) keep
+        # the newest document, so a slower, older run cannot overwrite a newer one
+        {"$merge": {
+            "into": "test_providers",
+            "on": "test_id",
+            "whenMatched": [{"$replaceWith": {
+                "$cond": [{"$gt": ["$refreshed_at", "$$new.refreshed_at"]}, "$$ROOT", "$$new"]
+            }}],
+            "whenNotMatched": "insert"
+        }}
+    ]).to_list(None)
+
+    # Tests that no longer have any available provider; documents a newer run wrote are left alone
+    stale = {"refreshed_at": {"$lt": refreshed_at}}
+    if test_ids is not None:
+        stale["test_id"] = {"$in": test_ids}
+    await db.test_providers.delete_many(stale)
+
+async def refresh_clinic_test_providers(clinic_id: str):
+    """Refresh the view for every test a clinic prices, after its details or rating change"""
+    test_ids = await db.test_pricing.distinct("test_id", {"clinic_id": clinic_id})
+    if test_ids:
+        await refresh_test_providers(test_ids)
+
+@api_router.get("/public/tests/{test_id}/provider-options", response_model=TestProviderOptions)
+async def get_test_provider_options(
+    test_id: str,
+    currency: Currency = Currency.USD,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Providers offering a test with their prices, cheapest first, from the test_providers view"""
+    async def load_provider_options():
+        view = await db.test_providers.find_one({"test_id": test_id}, {"_id": 0, "providers": 1})
+        rate = await get_lrd_rate()
+        providers = [
+            TestProviderOption(**with_lrd_price(provider, rate)) for provider in (view or {}).get("providers", [])
+        ]
+        if currency == Currency.LRD:
+            providers.sort(key=lambda provider: (provider.price_lrd, provider.price_usd))
+        return TestProviderOptions(test_id=test_id, currency=currency, providers=providers)
     
-    return result
+    return await catalog_response(f"provider-options:{test_id}:{currency.value}", load_provider_options, if_none_match)
+
+@api_router.post("/test-providers/rebuild")
+async def rebuild_test_providers(current_user: Principal = Depends(get_admin_user)):
+    await refresh_test_providers()
+    return {"message": "Test providers view rebuilt successfully"}
 
 # Booking endpoints
+def is_booking_number_collision(write_error: dict) -> bool:
+    return write_error.get("code") == 11000 and "booking_number" in str(
+        write_error.get("keyPattern") or write_error.get("errmsg", "")
+    )
+
+async def insert_bookings(bookings: List[Booking]):
+    """Insert new bookings all or nothing, then record their creation in the rollups and counters"""
+    remaining = bookings
+    for _ in range(BOOKING_INSERT_ATTEMPTS):
+        try:
+            await db.bookings.insert_many([booking.dict() for booking in remaining], ordered=False)
+            remaining = []
+            break
+        except BulkWriteError as e:
+            write_errors = e.details["writeErrors"]
+            if not all(is_booking_number_collision(write_error) for write_error in write_errors):
+                remaining = bookings
+                break
+            # Renumber the bookings that collided and try those again
+            remaining = [remaining[write_error["index"]] for write_error in write_errors]
+            for booking in remaining:
+                booking.booking_number = new_booking_number()
+    if remaining:
+        # Don't leave part of a cart behind for a retry to duplicate
+        await db.bookings.delete_many({"id": {"$in": [booking.id for booking in bookings]}})
+        raise HTTPException(status_code=500, detail="Could not save the booking, please try again")
+    await record_booking_events([
+        (booking.dict(), BookingStatus.PENDING, booking.created_at, True) for booking in bookings
+    ])
+
+async def get_test_prices(
+    tests_by_clinic: Dict[str, List[str]], currency: Currency
+) -> Dict[Tuple[str, str], float]:
+    """Price (clinic_id, test_id) pairs in one query; unpriced tests are rejected"""
+    if not tests_by_clinic:
+        return {}
+    currency_field = "price_usd" if currency == Currency.USD else "price_lrd"
+    pricing = await db.test_pricing.find(
+        {
+            "$or": [
+                {"clinic_id": clinic_id, "test_id": {"$in": test_ids}}
+                for clinic_id, test_ids in tests_by_clinic.items()
+            ],
+            "is_available": True
+        },
+        {"_id": 0, "clinic_id": 1, "test_id": 1, "price_usd": 1, "price_lrd": 1}
+    ).to_list(None)
+    rate = await get_lrd_rate()
+    prices = {
+        (price["clinic_id"], price["test_id"]): with_lrd_price(price, rate)[currency_field]
+        for price in pricing
+    }
+    
+    unavailable = [
+        test_id
+        for clinic_id, test_ids in tests_by_clinic.items()
+        for test_id in test_ids
+        if (clinic_id, test_id) not in prices
+    ]
+    if unavailable:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tests not available at the selected clinic: {', '.join(unavailable)}"
+        )
+    
+    return prices
+
 @api_router.post("/bookings", response_model=Booking)
 async def create_booking(booking_data: BookingCreate):
     # Calculate total amount
-    total_amount = 0.0
-    currency_field = "price_usd" if booking_data.preferred_currency == Currency.USD else "price_lrd"
-    
-    for test_id in booking_data.test_ids:
-        pricing = await db.test_pricing.find_one({
-            "test_id": test_id,
-            "clinic_id": booking_data.clinic_id,
-            "is_available": True
-        })
-        if pricing:
-            total_amount += pricing[currency_field]
-    
+    prices = await get_test_prices(
+        {booking_data.clinic_id: booking_data.test_ids}, booking_data.preferred_currency
+    )
+    test_prices = {test_id: prices[(booking_data.clinic_id, test_id)] for test_id in booking_data.test_ids}
+    total_amount = sum(test_prices[test_id] for test_id in booking_data.test_ids)
     total_amount += booking_data.delivery_charge
     
     # Create booking
-    booking_obj = Booking(**booking_data.dict())
+    booking_obj = Booking(**booking_data.dict(), test_prices=test_prices)
     booking_obj.total_amount = total_amount
     
-    await db.bookings.insert_one(booking_obj.dict())
+    await insert_bookings([booking_obj])
     return booking_obj
 
-@api_router.get("/bookings", response_model=List[Booking])
-async def get_bookings(current_user: User = Depends(get_current_user)):
+@api_router.post("/bookings/batch", response_model=CartCheckoutResult)
+async def create_cart_bookings(checkout: CartCheckout):
+    """Check out a cart: one booking per provider, priced in one query and inserted together"""
+    tests_by_clinic: Dict[str, List[str]] = {}
+    for item in checkout.items:
+        tests_by_clinic.setdefault(item.clinic_id, []).append(item.test_id)
+    
+    prices = await get_test_prices(tests_by_clinic, checkout.preferred_currency)
+    
+    patient_data = checkout.dict(exclude={"items", "delivery_charge"})
+    bookings = []
+    for clinic_id, test_ids in tests_by_clinic.items():
+        # The patient pays delivery once, however many providers the cart spans
+        delivery_charge = 0.0 if bookings else checkout.delivery_charge
+        test_prices = {test_id: prices[(clinic_id, test_id)] for test_id in test_ids}
+        booking_obj = Booking(
+            **patient_data, delivery_charge=delivery_charge,
+            clinic_id=clinic_id, test_ids=test_ids, test_prices=test_prices
+        )
+        booking_obj.total_amount = sum(test_prices[test_id] for test_id in test_ids) + delivery_charge
+        bookings.append(booking_obj)
+    
+    await insert_bookings(bookings)
+    
+    return CartCheckoutResult(
+        booking_numbers=[booking.booking_number for booking in bookings],
+        total_amount=sum(booking.total_amount for booking in bookings),
+        bookings=bookings
+    )
+
+@api_router.get("/bookings", response_model=BookingPage)
+async def get_bookings(
+    booking_status: Optional[BookingStatus] = Query(None, alias="status"),
+    clinic_id: Optional[str] = None,
+    currency: Optional[Currency] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Principal = Depends(get_current_user)
+):
+    """List bookings newest first, one keyset page at a time"""
+    query = {}
     if current_user.role in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
-        bookings = await db.bookings.find().to_list(1000)
+        if clinic_id:
+            query["clinic_id"] = clinic_id
     else:
         # Clinic users can only see bookings assigned to their clinic
-        clinic = await db.clinics.find_one({"user_id": current_user.id})
-        if not clinic:
-            return []
-        bookings = await db.bookings.find({"clinic_id": clinic["id"]}).to_list(1000)
-    
-    return [Booking(**booking) for booking in bookings]
+        if not current_user.clinic_id:
+            return BookingPage(bookings=[])
+        query["clinic_id"] = current_user.clinic_id
+
+    if booking_status:
+        query["status"] = booking_status.value
+    if currency:
+        query["preferred_currency"] = currency.value
+    if date_from or date_to:
+        query["created_at"] = {}
+        if date_from:
+            query["created_at"]["$gte"] = date_from
+        if date_to:
+            query["created_at"]["$lte"] = date_to
+
+    # Per-status totals for dashboard cards, sent with the first page
+    status_counts = None
+    if not cursor:
+        if "created_at" in query:
+            # Counters are not kept per day; a date range bounds the bookings scanned instead
+            counts = await db.bookings.aggregate([
+                {"$match": query},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]).to_list(None)
+        else:
+            counter_query = {
+                field: query[source]
+                for field, source in [("clinic_id", "clinic_id"), ("currency", "preferred_currency"), ("status", "status")]
+                if source in query
+            }
+            counts = await db.booking_status_counts.aggregate([
+                {"$match": counter_query},
+                {"$group": {"_id": "$status", "count": {"$sum": "$count"}}}
+            ]).to_list(None)
+        status_counts = {count["_id"]: count["count"] for count in counts if count["count"]}
+
+    bookings = await (
+        db.bookings.find(after_page_cursor(query, cursor), BOOKING_SUMMARY_PROJECTION)
+        .sort([("created_at", -1), ("id", -1)])
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_page_cursor(bookings[-1])
+
+    return BookingPage(
+        bookings=[BookingSummary(**booking) for booking in bookings],
+        next_cursor=next_cursor,
+        status_counts=status_counts
+    )
+
+@api_router.get("/bookings/status-counts", response_model=Dict[str, Dict[str, int]])
+async def get_booking_status_counts_by_clinic(current_user: Principal = Depends(get_staff_user)):
+    """Per-status booking totals for every clinic, keyed by clinic_id, from the maintained counters"""
+    counts = await db.booking_status_counts.aggregate([
+        {"$match": {"count": {"$gt": 0}}},
+        {"$group": {"_id": {"clinic_id": "$clinic_id", "status": "$status"}, "count": {"$sum": "$count"}}}
+    ]).to_list(None)
+    by_clinic: Dict[str, Dict[str, int]] = {}
+    for count in counts:
+        by_clinic.setdefault(count["_id"]["clinic_id"], {})[count["_id"]["status"]] = count["count"]
+    return by_clinic
 
 @api_router.get("/bookings/{booking_id}", response_model=Booking)
-async def get_booking(booking_id: str, current_user: User = Depends(get_current_user)):
+async def get_booking(booking_id: str, current_user: Principal = Depends(get_current_user)):
     booking = await db.bookings.find_one({"id": booking_id})
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     
     # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
-        clinic = await db.clinics.find_one({"user_id": current_user.id})
-        if not clinic or booking["clinic_id"] != clinic["id"]:
-            raise HTTPException(status_code=403, detail="Access denied")
+    ensure_booking_access(current_user, booking)
     
     return Booking(**booking)
 
+def booking_transition_filter(
+    booking_id: str, new_status: BookingStatus, current_user: Principal, allow_same: bool = False
+) -> dict:
+    """Matches the booking only if it may move to new_status and the caller may act on it"""
+    sources = [current.value for current, allowed in BOOKING_STATUS_TRANSITIONS.items() if new_status in allowed]
+    if allow_same:
+        sources.append(new_status.value)
+    query = {"id": booking_id, "status": {"$in": sources}}
+    if current_user.role not in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
+        query["clinic_id"] = current_user.clinic_id
+    return query
+
+async def explain_failed_transition(booking_id: str, new_status: BookingStatus, current_user: Principal):
+    """Raise the error for a conditional status update that matched nothing"""
+    booking = await db.bookings.find_one({"id": booking_id}, {"_id": 0, "clinic_id": 1, "status": 1})
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    ensure_booking_access(current_user, booking)
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Cannot change booking status from {booking.get('status')} to {new_status.value}"
+    )
+
 @api_router.put("/bookings/{booking_id}/status")
 async def update_booking_status(
     booking_id: str, 
-    status_data: dict,
-    current_user: User = Depends(get_current_user)
+    status_data: BookingStatusUpdate,
+    current_user: Principal = Depends(get_current_user)
 ):
-    booking = await db.bookings.find_one({"id": booking_id})
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
-        clinic = await db.clinics.find_one({"user_id": current_user.id})
-        if not clinic or booking["clinic_id"] != clinic["id"]:
-            raise HTTPException(status_code=403, detail="Access denied")
-    
-    status = status_data.get("status")
-    if not status:
-        raise HTTPException(status_code=400, detail="Status is required")
-    
-    result = await db.bookings.update_one(
-        {"id": booking_id}, 
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+    # One conditional update: concurrent changes cannot both apply, and no prior read is needed
+    updated_at = datetime.utcnow()
+    booking = await db.bookings.find_one_and_update(
+        booking_transition_filter(booking_id, status_data.status, current_user),
+        {"$set": {"status": status_data.status.value, "updated_at": updated_at}},
+        projection={"_id": 0, "result_files": 0},
+        return_document=ReturnDocument.BEFORE
     )
+    if not booking:
+        await explain_failed_transition(booking_id, status_data.status, current_user)
     
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Booking not found")
+    await record_booking_events([(booking, status_data.status, updated_at, False)])
     
     return {"message": "Booking status updated successfully"}
 
+@api_router.post("/bookings/bulk-update", response_model=BookingBulkUpdateResult)
+async def bulk_update_bookings(update: BookingBulkUpdate, current_user: Principal = Depends(get_staff_user)):
+    """Move many bookings to one status and/or assign them, in a single bulk_write"""
+    assign = "assigned_to" in update.model_fields_set
+    if update.status is None and not assign:
+        raise HTTPException(status_code=400, detail="Status or assigned_to is required")
+    if update.assigned_to and not await db.users.find_one(
+        {"id": update.assigned_to, "role": {"$in": [UserRole.ADMIN.value, UserRole.SUB_ADMIN.value]}}, {"_id": 1}
+    ):
+        raise HTTPException(status_code=400, detail="Bookings can only be assigned to an admin or sub-admin user")
+    
+    booking_ids = list(dict.fromkeys(update.booking_ids))
+    bookings = await db.bookings.find(
+        {"id": {"$in": booking_ids}}, {"_id": 0, "result_files": 0}
+    ).to_list(None)
+    bookings_by_id = {booking["id"]: booking for booking in bookings}
+    
+    updated_at = datetime.utcnow()
+    changes = {"updated_at": updated_at}
+    if update.status:
+        changes["status"] = update.status.value
+    if assign:
+        changes["assigned_to"] = update.assigned_to or None
+    
+    results: Dict[str, BookingUpdateResult] = {}
+    attempted, operations = [], []
+    for booking_id in booking_ids:
+        booking = bookings_by_id.get(booking_id)
+        if not booking:
+            results[booking_id] = BookingUpdateResult(booking_id=booking_id, success=False, error="Booking not found")
+            continue
+        results[booking_id] = BookingUpdateResult(
+            booking_id=booking_id, success=True, previous_status=booking.get("status")
+        )
+        query = {"id": booking_id}
+        if update.status:
+            current_status = booking.get("status")
+            allowed = BOOKING_STATUS_TRANSITIONS.get(BookingStatus(current_status), []) if current_status in BOOKING_STATUS_VALUES else []
+            if update.status not in allowed:
+                results[booking_id].success = False
+                results[booking_id].error = f"Cannot change booking status from {current_status} to {update.status.value}"
+                continue
+            # Only apply if nobody changed the status since it was read
+            query["status"] = current_status
+        attempted.append(booking_id)
+        operations.append(UpdateOne(query, {"$set": changes}))
+    
+    if operations:
+        result = await db.bookings.bulk_write(operations, ordered=False)
+        if result.matched_count < len(operations):
+            applied = set(await db.bookings.distinct(
+                "id", {"id": {"$in": attempted}, "updated_at": updated_at}
+            ))
+            for booking_id in attempted:
+                if booking_id not in applied:
+                    results[booking_id].success = False
+                    results[booking_id].error = "Booking changed concurrently, please retry"
+    
+    succeeded = [results[booking_id] for booking_id in booking_ids if results[booking_id].success]
+    if update.status:
+        await record_booking_events([
+            (bookings_by_id[result.booking_id], update.status, updated_at, False)
+            for result in succeeded
+        ])
+    
+    return BookingBulkUpdateResult(updated=len(succeeded), results=[results[booking_id] for booking_id in booking_ids])
+
+@api_router.post("/bookings/results/migrate")
+async def migrate_legacy_result_files_endpoint(current_user: Principal = Depends(get_admin_user)):
+    migrated = await migrate_legacy_result_files()
+    return {"message": "Legacy result files migrated successfully", "migrated_bookings": migrated}
+
 @api_router.post("/bookings/{booking_id}/upload-results")
 async def upload_results(
     booking_id: str,
     files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    booking = await db.bookings.find_one({"id": booking_id})
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    
-    # Check permissions
-    if current_user.role not in [UserRole.ADMIN, UserRole.SUB_ADMIN]:
-        clinic = await db.clinics.find_one({"user_id": current_user.id})
-        if not clinic or booking["clinic_id"] != clinic["id"]:
-            raise HTTPException(status_code=403, detail="Access denied")
+    # Results may be uploaded again while they are ready, but never to a completed or cancelled booking
+    transition = booking_transition_filter(booking_id, BookingStatus.RESULTS_READY, current_user, allow_same=True)
+    if not await db.bookings.find_one(transition, {"_id": 1}):
+        await explain_failed_transition(booking_id, BookingStatus.RESULTS_READY, current_user)
     
-    # Process uploaded files (convert to base64 for storage)
+    # Stream uploaded files into result storage; the booking only keeps metadata
     result_files = []
-    for file in files:
-        content = await file.read()
-        base64_content = base64.b64encode(content).decode('utf-8')
-        result_files.append({
-            "filename": file.filename,
-            "content_type": file.content_type,
-            "data": base64_content
-        })
-    
-    # Update booking with result files
-    result = await db.bookings.update_one(
-        {"id": booking_id},
+    try:
+        for file in files:
+            result_file = ResultFile(filename=file.filename, content_type=file.content_type)
+            result_file.length = await result_storage.save(
+                result_file.id, file, {"booking_id": booking_id, "content_type": file.content_type}
+            )
+            result_files.append(result_file)
+    except Exception:
+        for result_file in result_files:
+            await result_storage.delete(result_file.id)
+        raise
+
+    # Update booking with result files, unless its status moved on while the files were streaming
+    updated_at = datetime.utcnow()
+    booking = await db.bookings.find_one_and_update(
+        transition,
         {
             "$set": {
-                "result_files": result_files,
+                "result_files": [result_file.dict() for result_file in result_files],
                 "status": BookingStatus.RESULTS_READY,
-                "updated_at": datetime.utcnow()
+                "updated_at": updated_at
             }
-        }
+        },
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
     )
-    
-    if result.modified_count == 0:
+
+    if not booking:
+        for result_file in result_files:
+            await result_storage.delete(result_file.id)
+        await explain_failed_transition(booking_id, BookingStatus.RESULTS_READY, current_user)
+
+    if booking.get("status") != BookingStatus.RESULTS_READY.value:
+        await record_booking_events([(booking, BookingStatus.RESULTS_READY, updated_at, False)])
+
+    # Remove the stored files these results replaced
+    for old_file in booking.get("result_files", []):
+        if isinstance(old_file, dict) and old_file.get("id"):
+            await result_storage.delete(old_file["id"])
+
+    return {
+        "message": "Results uploaded successfully",
+        "files_count": len(result_files),
+        "files": result_files
+    }
+
+@api_router.get("/bookings/{booking_id}/results/{file_id}")
+async def download_result_file(
+    booking_id: str,
+    file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream a stored result file, honouring single-range Range requests"""
+    booking = await db.bookings.find_one({"id": booking_id}, {"clinic_id": 1, "result_files": 1})
+    if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    
-    return {"message": "Results uploaded successfully", "files_count": len(result_files)}
+
+    # Check permissions
+    ensure_booking_access(current_user, booking)
+
+    stored_file = next(
+        (f for f in booking.get("result_files", []) if isinstance(f, dict) and f.get("id") == file_id),
+        None
+    )
+    if not stored_file:
+        raise HTTPException(status_code=404, detail="Result file not found")
+    result_file = ResultFile(**stored_file)
+
+    byte_range = parse_range_header(range_header, result_file.length)
+    start, end = byte_range or (0, result_file.length - 1)
+    try:
+        body = await result_storage.open_range(result_file.id, start, end)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Result file not found")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": attachment_disposition(result_file.filename)
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{result_file.length}"
+
+    return StreamingResponse(
+        body,
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=result_file.content_type or "application/octet-stream",
+        headers=headers
+    )
 
 # Feedback endpoints
 @api_router.post("/feedback", response_model=Feedback)
 async def create_feedback(feedback_data: FeedbackCreate):
     # Verify booking exists
-    booking = await db.bookings.find_one({"id": feedback_data.booking_id})
+    booking = await db.bookings.find_one(
+        {"id": feedback_data.booking_id}, {"clinic_id": 1, "booking_number": 1}
+    )
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     
-    feedback_obj = Feedback(**feedback_data.dict())
+    feedback_obj = Feedback(
+        **feedback_data.dict(),
+        clinic_id=booking["clinic_id"],
+        booking_number=booking.get("booking_number")
+    )
     await db.feedback.insert_one(feedback_obj.dict())
     
     # Update clinic rating
-    clinic_id = booking["clinic_id"]
-    await update_clinic_rating(clinic_id)
+    await add_clinic_rating(booking["clinic_id"], feedback_obj.rating)
     
     return feedback_obj
 
-async def update_clinic_rating(clinic_id: str):
-    # Get all feedback for this clinic's bookings
-    bookings = await db.bookings.find({"clinic_id": clinic_id}).to_list(1000)
-    booking_ids = [booking["id"] for booking in bookings]
-    
-    feedback_list = await db.feedback.find({"booking_id": {"$in": booking_ids}}).to_list(1000)
-    
-    if feedback_list:
-        avg_rating = sum(feedback["rating"] for feedback in feedback_list) / len(feedback_list)
-        total_reviews = len(feedback_list)
-        
-        await db.clinics.update_one(
-            {"id": clinic_id},
-            {"$set": {"rating": round(avg_rating, 1), "total_reviews": total_reviews}}
+# Average rating and review count derived from a clinic's running rating_sum/rating_count
+CLINIC_RATING_FIELDS = {
+    "total_reviews": "$rating_count",
+    "rating": {"$round": [{"$divide": ["$rating_sum", "$rating_count"]}, 1]}
+}
+
+async def add_clinic_rating(clinic_id: str, rating: int):
+    """Fold one review into the clinic's running rating aggregates in a single atomic update"""
+    # Clinics rated before the running aggregates existed start from their stored average
+    clinic = await db.clinics.find_one_and_update({"id": clinic_id}, [
+        {"$set": {
+            "rating_sum": {"$add": [
+                {"$ifNull": ["$rating_sum", {"$multiply": [
+                    {"$ifNull": ["$rating", 0]}, {"$ifNull": ["$total_reviews", 0]}
+                ]}]},
+                rating
+            ]},
+            "rating_count": {"$add": [{"$ifNull": ["$rating_count", {"$ifNull": ["$total_reviews", 0]}]}, 1]}
+        }},
+        {"$set": CLINIC_RATING_FIELDS}
+    ], projection={"_id": 0, "rating": 1, "total_reviews": 1}, return_document=ReturnDocument.AFTER)
+    if not clinic:
+        return
+
+    # Patch the clinic's entry in each test_providers document rather than rebuilding them
+    test_ids = await db.test_providers.distinct("test_id", {"providers.clinic_id": clinic_id})
+    if test_ids:
+        await db.test_providers.update_many(
+            {"test_id": {"$in": test_ids}},
+            {"$set": {"providers.$[p].rating": clinic["rating"], "providers.$[p].total_reviews": clinic["total_reviews"]}},
+            array_filters=[{"p.clinic_id": clinic_id}]
         )
-
-@api_router.get("/feedback/clinic/{clinic_id}")
-async def get_clinic_feedback(clinic_id: str):
-    # Get all bookings for this clinic
-    bookings = await db.bookings.find({"clinic_id": clinic_id}).to_list(1000)
-    booking_ids = [booking["id"] for booking in bookings]
+    catalog_cache.invalidate("clinics", *[
+        key for test_id in test_ids
+        for key in [f"providers:{test_id}", *(f"provider-options:{test_id}:{currency.value}" for currency in Currency)]
+    ])
+
+async def backfill_feedback_clinics():
+    """Copy clinic_id and booking_number from bookings onto feedback stored without them"""
+    await db.feedback.aggregate([
+        {"$match": {"clinic_id": None}},
+        {"$lookup": {"from": "bookings", "localField": "booking_id", "foreignField": "id", "as": "booking"}},
+        {"$unwind": "$booking"},
+        {"$project": {
+            "_id": 0,
+            "id": 1,
+            "clinic_id": "$booking.clinic_id",
+            "booking_number": "$booking.booking_number"
+        }},
+        {"$merge": {"into": "feedback", "on": "id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+    ]).to_list(None)
+
+async def rebuild_clinic_ratings() -> int:
+    """Recompute every clinic's rating aggregates from the feedback collection"""
+    await backfill_feedback_clinics()
+    # One pass over clinics, so unreviewed clinics are reset in the same write that rates the others
+    # and readers never see every clinic at zero while the totals are recomputed
+    await db.clinics.aggregate([
+        {"$project": {"_id": 0, "id": 1}},
+        {"$lookup": {
+            "from": "feedback",
+            "localField": "id",
+            "foreignField": "clinic_id",
+            "pipeline": [{"$group": {"_id": None, "rating_sum": {"$sum": "$rating"}, "rating_count": {"$sum": 1}}}],
+            "as": "totals"
+        }},
+        {"$project": {
+            "id": 1,
+            "rating_sum": {"$ifNull": [{"$first": "$totals.rating_sum"}, 0]},
+            "rating_count": {"$ifNull": [{"$first": "$totals.rating_count"}, 0]}
+        }},
+        {"$merge": {
+            "into": "clinics",
+            "on": "id",
+            "whenMatched": [
+                {"$set": {"rating_sum": "$$new.rating_sum", "rating_count": "$$new.rating_count"}},
+                {"$set": {
+                    "total_reviews": "$rating_count",
+                    "rating": {"$cond": [
+                        {"$gt": ["$rating_count", 0]}, CLINIC_RATING_FIELDS["rating"], 0.0
+                    ]}
+                }}
+            ],
+            "whenNotMatched": "discard"
+        }}
+    ]).to_list(None)
+    await refresh_test_providers()
+    catalog_cache.invalidate()
+    return await db.clinics.count_documents({"rating_count": {"$gt": 0}})
+
+@api_router.post("/clinics/ratings/rebuild")
+async def rebuild_clinic_ratings_endpoint(current_user: Principal = Depends(get_admin_user)):
+    rated_clinics = await rebuild_clinic_ratings()
+    return {"message": "Clinic ratings rebuilt successfully", "rated_clinics": rated_clinics}
+
+@api_router.get("/feedback/clinic/{clinic_id}", response_model=FeedbackPage)
+async def get_clinic_feedback(
+    clinic_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    feedback_list = await (
+        db.feedback.find(after_page_cursor({"clinic_id": clinic_id}, cursor), {"_id": 0})
+        .sort([("created_at", -1), ("id", -1)])
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
     
-    feedback_list = await db.feedback.find({"booking_id": {"$in": booking_ids}}).to_list(1000)
-    return [Feedback(**feedback) for feedback in feedback_list]
+    next_cursor = None
+    if len(feedback_list) > limit:
+        feedback_list = feedback_list[:limit]
+        next_cursor = encode_page_cursor(feedback_list[-1])
+    
+    return FeedbackPage(feedback=[Feedback(**feedback) for feedback in feedback_list], next_cursor=next_cursor)
 
 # Surgery inquiry endpoints
 @api_router.post("/surgery-inquiries", response_model=SurgeryInquiry)
@@ -619,18 +2233,28 @@ async def create_surgery_inquiry(inquiry_data: SurgeryInquiryCreate):
     await db.surgery_inquiries.insert_one(inquiry_obj.dict())
     return inquiry_obj
 
-@api_router.get("/surgery-inquiries", response_model=List[SurgeryInquiry])
-async def get_surgery_inquiries(current_user: User = Depends(get_admin_user)):
-    inquiries = await db.surgery_inquiries.find().to_list(1000)
-    return [SurgeryInquiry(**inquiry) for inquiry in inquiries]
+@api_router.get("/surgery-inquiries", response_model=List[SurgeryInquirySummary])
+async def get_surgery_inquiries(current_user: Principal = Depends(get_admin_user)):
+    inquiries = await db.surgery_inquiries.find({}, SURGERY_INQUIRY_SUMMARY_PROJECTION).to_list(1000)
+    return [SurgeryInquirySummary(**inquiry) for inquiry in inquiries]
 
 @api_router.get("/surgery-inquiries/{inquiry_id}", response_model=SurgeryInquiry)
-async def get_surgery_inquiry(inquiry_id: str, current_user: User = Depends(get_admin_user)):
+async def get_surgery_inquiry(inquiry_id: str, current_user: Principal = Depends(get_admin_user)):
     inquiry = await db.surgery_inquiries.find_one({"id": inquiry_id})
     if not inquiry:
         raise HTTPException(status_code=404, detail="Surgery inquiry not found")
     return SurgeryInquiry(**inquiry)
 
+@api_router.get("/surgery-inquiries/{inquiry_id}/medical-report")
+async def get_surgery_inquiry_medical_report(inquiry_id: str, current_user: Principal = Depends(get_admin_user)):
+    """Get the uploaded medical report (including file data) for a surgery inquiry"""
+    inquiry = await db.surgery_inquiries.find_one({"id": inquiry_id}, {"_id": 0, "medical_report": 1})
+    if not inquiry:
+        raise HTTPException(status_code=404, detail="Surgery inquiry not found")
+    if not inquiry.get("medical_report"):
+        raise HTTPException(status_code=404, detail="Medical report not found")
+    return inquiry["medical_report"]
+
 @api_router.put("/surgery-inquiries/{inquiry_id}")
 async def update_surgery_inquiry(
     inquiry_id: str,
@@ -638,7 +2262,7 @@ async def update_surgery_inquiry(
     accommodation_details: Optional[str] = None,
     estimated_cost: Optional[str] = None,
     status: Optional[str] = None,
-    current_user: User = Depends(get_admin_user)
+    current_user: Principal = Depends(get_admin_user)
 ):
     update_data = {"updated_at": datetime.utcnow()}
     
@@ -663,124 +2287,611 @@ async def update_surgery_inquiry(
 
 # Analytics endpoints
 @api_router.get("/analytics/dashboard")
-async def get_dashboard_analytics(current_user: User = Depends(get_admin_user)):
-    # Get counts
-    total_bookings = await db.bookings.count_documents({})
-    total_clinics = await db.clinics.count_documents({})
-    total_tests = await db.tests.count_documents({})
-    total_surgery_inquiries = await db.surgery_inquiries.count_documents({})
-    
-    # Get revenue (sum of completed bookings)
-    completed_bookings = await db.bookings.find({"status": BookingStatus.COMPLETED}).to_list(1000)
-    total_revenue_usd = sum(booking["total_amount"] for booking in completed_bookings 
-                           if booking.get("preferred_currency") == Currency.USD)
-    total_revenue_lrd = sum(booking["total_amount"] for booking in completed_bookings 
-                           if booking.get("preferred_currency") == Currency.LRD)
-    
-    # Get recent bookings
-    recent_bookings = await db.bookings.find().sort("created_at", -1).limit(5).to_list(5)
-    
-    # Get top clinics by booking count
-    pipeline = [
-        {"$group": {"_id": "$clinic_id", "booking_count": {"$sum": 1}}},
-        {"$sort": {"booking_count": -1}},
-        {"$limit": 5}
-    ]
-    top_clinics_data = await db.bookings.aggregate(pipeline).to_list(5)
-    
-    top_clinics = []
-    for clinic_data in top_clinics_data:
-        clinic = await db.clinics.find_one({"id": clinic_data["_id"]})
-        if clinic:
-            top_clinics.append({
-                "clinic": Clinic(**clinic),
-                "booking_count": clinic_data["booking_count"]
-            })
+async def get_dashboard_analytics(current_user: Principal = Depends(get_admin_user)):
+    # Catalog totals come from collection metadata rather than a count scan
+    total_clinics = await db.clinics.estimated_document_count()
+    total_tests = await db.tests.estimated_document_count()
+    total_surgery_inquiries = await db.surgery_inquiries.estimated_document_count()
+    
+    # Everything about bookings in a single pass
+    facets = await db.bookings.aggregate([
+        {"$facet": {
+            "totals": [{"$count": "bookings"}],
+            "revenue": [
+                {"$match": {"status": BookingStatus.COMPLETED.value}},
+                {"$group": {"_id": "$preferred_currency", "total": {"$sum": "$total_amount"}}}
+            ],
+            "recent_bookings": [
+                {"$sort": {"created_at": -1, "id": -1}},
+                {"$limit": 5},
+                {"$project": BOOKING_SUMMARY_PROJECTION}
+            ],
+            "top_clinics": [
+                {"$group": {"_id": "$clinic_id", "booking_count": {"$sum": 1}}},
+                {"$sort": {"booking_count": -1}},
+                {"$limit": 5},
+                {"$lookup": {"from": "clinics", "localField": "_id", "foreignField": "id", "as": "clinic"}},
+                {"$unwind": "$clinic"},
+                {"$project": {"_id": 0, "clinic._id": 0}}
+            ]
+        }}
+    ]).to_list(1)
+    dashboard = facets[0]
+    
+    revenue = {row["_id"]: row["total"] for row in dashboard["revenue"]}
     
     return {
         "totals": {
-            "bookings": total_bookings,
+            "bookings": dashboard["totals"][0]["bookings"] if dashboard["totals"] else 0,
             "clinics": total_clinics,
             "tests": total_tests,
             "surgery_inquiries": total_surgery_inquiries
         },
         "revenue": {
-            "usd": total_revenue_usd,
-            "lrd": total_revenue_lrd
+            "usd": revenue.get(Currency.USD.value, 0),
+            "lrd": revenue.get(Currency.LRD.value, 0)
         },
-        "recent_bookings": [Booking(**booking) for booking in recent_bookings],
-        "top_clinics": top_clinics
+        "recent_bookings": [BookingSummary(**booking) for booking in dashboard["recent_bookings"]],
+        "top_clinics": [
+            {"clinic": Clinic(**row["clinic"]), "booking_count": row["booking_count"]}
+            for row in dashboard["top_clinics"]
+        ]
     }
 
-# Search endpoints
-@api_router.get("/search/tests")
-async def search_tests(query: str):
-    tests = await db.tests.find({
-        "$or": [
-            {"name": {"$regex": query, "$options": "i"}},
-            {"description": {"$regex": query, "$options": "i"}},
-            {"category": {"$regex": query, "$options": "i"}}
+# Daily analytics rollups
+# One analytics_daily document per (date, clinic_id, currency) holds booking counts, booked and
+# completed revenue, per-test counts/revenue under "tests" and status moves under "transitions".
+ANALYTICS_REBUILD_COLLECTION = "analytics_daily_rebuild"
+
+def booking_test_revenue(booking: dict) -> List[Tuple[str, float]]:
+    """Revenue per booked test; bookings without a price snapshot split their test total evenly"""
+    test_ids = booking.get("test_ids", [])
+    test_prices = booking.get("test_prices") or {}
+    if test_ids and not all(test_id in test_prices for test_id in test_ids):
+        share = (booking.get("total_amount", 0.0) - booking.get("delivery_charge", 0.0)) / len(test_ids)
+        return [(test_id, share) for test_id in test_ids]
+    return [(test_id, test_prices[test_id]) for test_id in test_ids]
+
+def booking_rollup_update(
+    booking: dict, new_status: str, moment: datetime, created: bool
+) -> Tuple[dict, Dict[str, float]]:
+    """Rollup key and $inc document for one booking event: its creation or a status change"""
+    key = {
+        "date": datetime(moment.year, moment.month, moment.day),
+        "clinic_id": booking["clinic_id"],
+        "currency": Currency(booking.get("preferred_currency", Currency.USD)).value
+    }
+    new_status = BookingStatus(new_status)
+    increments: Dict[str, float] = {f"transitions.{new_status.value}": 1}
+    if created:
+        increments["bookings"] = 1
+        increments["revenue"] = booking.get("total_amount", 0.0)
+        for test_id, revenue in booking_test_revenue(booking):
+            increments[f"tests.{test_id}.bookings"] = increments.get(f"tests.{test_id}.bookings", 0) + 1
+            increments[f"tests.{test_id}.revenue"] = increments.get(f"tests.{test_id}.revenue", 0.0) + revenue
+    if new_status == BookingStatus.COMPLETED:
+        increments["completed_revenue"] = booking.get("total_amount", 0.0)
+    return key, increments
+
+def booking_status_count_updates(booking: dict, new_status: str, created: bool) -> List[UpdateOne]:
+    """Moves between the current per-clinic, per-currency status counters for one booking event"""
+    key = {
+        "clinic_id": booking["clinic_id"],
+        "currency": Currency(booking.get("preferred_currency", Currency.USD)).value
+    }
+    new_status = BookingStatus(new_status).value
+    previous_status = None if created else booking.get("status", BookingStatus.PENDING.value)
+    if previous_status == new_status:
+        return []
+    updates = [UpdateOne({**key, "status": new_status}, {"$inc": {"count": 1}}, upsert=True)]
+    if previous_status:
+        updates.append(UpdateOne({**key, "status": previous_status}, {"$inc": {"count": -1}}, upsert=True))
+    return updates
+
+async def record_booking_events(events: List[Tuple[dict, str, datetime, bool]]):
+    """Apply (booking, new_status, moment, created) events to the daily rollups and status counters"""
+    updates = [
+        UpdateOne(key, {"$inc": increments}, upsert=True)
+        for key, increments in (booking_rollup_update(*event) for event in events)
+    ]
+    if updates:
+        await db.analytics_daily.bulk_write(updates, ordered=False)
+    count_updates = [
+        update for booking, new_status, _, created in events
+        for update in booking_status_count_updates(booking, new_status, created)
+    ]
+    if count_updates:
+        await db.booking_status_counts.bulk_write(count_updates, ordered=False)
+
+async def rebuild_booking_status_counts():
+    """Recount booking_status_counts from the bookings collection, replacing it in one step"""
+    await db.bookings.aggregate([
+        {"$group": {
+            "_id": {
+                "clinic_id": "$clinic_id",
+                "currency": {"$ifNull": ["$preferred_currency", Currency.USD.value]},
+                "status": {"$ifNull": ["$status", BookingStatus.PENDING.value]}
+            },
+            "count": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0, "clinic_id": "$_id.clinic_id", "currency": "$_id.currency",
+            "status": "$_id.status", "count": 1
+        }},
+        {"$out": "booking_status_counts"}
+    ]).to_list(None)
+
+def booking_events_pipeline() -> List[dict]:
+    """Aggregation stages turning each booking into its rollup events, one document per event"""
+    # Bookings keep no status history, so each one contributes its creation on created_at and,
+    # unless still pending, a single move to its current status on updated_at
+    pending = BookingStatus.PENDING.value
+    return [
+        {"$project": {
+            "_id": 0,
+            "clinic_id": 1,
+            "currency": {"$ifNull": ["$preferred_currency", Currency.USD.value]},
+            "total_amount": {"$ifNull": ["$total_amount", 0.0]},
+            "tests": {"$let": {
+                "vars": {
+                    "ids": {"$ifNull": ["$test_ids", []]},
+                    "prices": {"$objectToArray": {"$ifNull": ["$test_prices", {}]}}
+                },
+                # Same split as booking_test_revenue
+                "in": {"$map": {"input": "$$ids", "as": "test_id", "in": {
+                    "test_id": "$$test_id",
+                    "revenue": {"$cond": [
+                        {"$allElementsTrue": [{"$map": {"input": "$$ids", "in": {"$in": ["$$this", "$$prices.k"]}}}]},
+                        {"$arrayElemAt": ["$$prices.v", {"$indexOfArray": ["$$prices.k", "$$test_id"]}]},
+                        {"$divide": [
+                            {"$subtract": [{"$ifNull": ["$total_amount", 0.0]}, {"$ifNull": ["$delivery_charge", 0.0]}]},
+                            {"$size": "$$ids"}
+                        ]}
+                    ]}
+                }}}
+            }},
+            "events": {"$concatArrays": [
+                [{"created": True, "status": pending, "moment": "$created_at"}],
+                {"$cond": [
+                    {"$and": [
+                        {"$ne": [{"$ifNull": ["$status", pending]}, pending]},
+                        {"$in": ["$status", list(BOOKING_STATUS_VALUES)]}
+                    ]},
+                    [{"created": False, "status": "$status", "moment": {"$ifNull": ["$updated_at", "$created_at"]}}],
+                    []
+                ]}
+            ]}
+        }},
+        {"$unwind": "$events"},
+        {"$set": {"date": {"$dateTrunc": {"date": "$events.moment", "unit": "day"}}}},
+    ]
+
+async def rebuild_analytics_rollups() -> int:
+    """Rebuild analytics_daily from the bookings collection into a scratch collection, then swap it in"""
+    scratch = db[ANALYTICS_REBUILD_COLLECTION]
+    await scratch.drop()
+    await scratch.create_indexes(INDEX_REGISTRY["analytics_daily"])
+    key = {"date": "$date", "clinic_id": "$clinic_id", "currency": "$currency"}
+    into_scratch = {
+        "into": ANALYTICS_REBUILD_COLLECTION, "on": ["date", "clinic_id", "currency"], "whenMatched": "merge"
+    }
+
+    await db.bookings.aggregate([
+        *booking_events_pipeline(),
+        {"$group": {
+            "_id": key,
+            "bookings": {"$sum": {"$cond": ["$events.created", 1, 0]}},
+            "revenue": {"$sum": {"$cond": ["$events.created", "$total_amount", 0.0]}},
+            "completed_revenue": {"$sum": {"$cond": [
+                {"$eq": ["$events.status", BookingStatus.COMPLETED.value]}, "$total_amount", 0.0
+            ]}},
+            **{
+                f"transitions_{booking_status.value}": {"$sum": {"$cond": [
+                    {"$eq": ["$events.status", booking_status.value]}, 1, 0
+                ]}}
+                for booking_status in BookingStatus
+            }
+        }},
+        {"$project": {
+            "_id": 0, "date": "$_id.date", "clinic_id": "$_id.clinic_id", "currency": "$_id.currency",
+            "bookings": 1, "revenue": 1, "completed_revenue": 1,
+            "transitions": {booking_status.value: f"$transitions_{booking_status.value}" for booking_status in BookingStatus}
+        }},
+        {"$merge": {**into_scratch, "whenNotMatched": "insert"}}
+    ]).to_list(None)
+
+    # Per-test counts and revenue come from creation events only
+    await db.bookings.aggregate([
+        *booking_events_pipeline(),
+        {"$match": {"events.created": True}},
+        {"$unwind": "$tests"},
+        {"$group": {
+            "_id": {**key, "test_id": "$tests.test_id"},
+            "bookings": {"$sum": 1},
+            "revenue": {"$sum": "$tests.revenue"}
+        }},
+        {"$group": {
+            "_id": {"date": "$_id.date", "clinic_id": "$_id.clinic_id", "currency": "$_id.currency"},
+            "tests": {"$push": {"k": "$_id.test_id", "v": {"bookings": "$bookings", "revenue": "$revenue"}}}
+        }},
+        {"$project": {
+            "_id": 0, "date": "$_id.date", "clinic_id": "$_id.clinic_id", "currency": "$_id.currency",
+            "tests": {"$arrayToObject": "$tests"}
+        }},
+        {"$merge": {**into_scratch, "whenNotMatched": "discard"}}
+    ]).to_list(None)
+
+    rollup_documents = await scratch.count_documents({})
+    # Replaced in one step, so readers never see a partial rebuild
+    await scratch.rename("analytics_daily", dropTarget=True)
+    return rollup_documents
+
+def rollup_match(
+    date_from: Optional[datetime], date_to: Optional[datetime],
+    clinic_id: Optional[str], currency: Optional[Currency]
+) -> dict:
+    match = {}
+    if date_from or date_to:
+        match["date"] = {}
+        if date_from:
+            match["date"]["$gte"] = datetime(date_from.year, date_from.month, date_from.day)
+        if date_to:
+            match["date"]["$lte"] = date_to
+    if clinic_id:
+        match["clinic_id"] = clinic_id
+    if currency:
+        match["currency"] = currency.value
+    return match
+
+def rollup_period(interval: TimeseriesInterval) -> dict:
+    return {"$dateTrunc": {"date": "$date", "unit": interval.value, "startOfWeek": "monday"}}
+
+@api_router.get("/analytics/timeseries")
+async def get_analytics_timeseries(
+    metric: TimeseriesMetric = TimeseriesMetric.REVENUE,
+    interval: TimeseriesInterval = TimeseriesInterval.DAY,
+    group_by: Optional[TimeseriesGroup] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    clinic_id: Optional[str] = None,
+    test_id: Optional[str] = None,
+    currency: Optional[Currency] = None,
+    current_user: Principal = Depends(get_admin_user)
+):
+    """Bookings or revenue per day/week/month from the daily rollups, optionally grouped"""
+    per_test = group_by == TimeseriesGroup.TEST or test_id is not None
+    if per_test and metric == TimeseriesMetric.COMPLETED_REVENUE:
+        raise HTTPException(status_code=400, detail="completed_revenue is not tracked per test")
+    
+    pipeline = [{"$match": rollup_match(date_from, date_to, clinic_id, currency)}]
+    if per_test:
+        pipeline += [
+            {"$project": {"date": 1, "clinic_id": 1, "currency": 1, "tests": {"$objectToArray": "$tests"}}},
+            {"$unwind": "$tests"}
         ]
-    }).to_list(100)
+        if test_id:
+            pipeline.append({"$match": {"tests.k": test_id}})
+        value = f"$tests.v.{metric.value}"
+    else:
+        value = f"${metric.value}"
     
-    return [Test(**test) for test in tests]
-
-@api_router.get("/search/clinics")
-async def search_clinics(query: str):
-    clinics = await db.clinics.find({
-        "$or": [
-            {"name": {"$regex": query, "$options": "i"}},
-            {"description": {"$regex": query, "$options": "i"}},
-            {"location": {"$regex": query, "$options": "i"}},
-            {"services": {"$regex": query, "$options": "i"}}
+    group_fields = {
+        TimeseriesGroup.CLINIC: "$clinic_id",
+        TimeseriesGroup.TEST: "$tests.k",
+        TimeseriesGroup.CURRENCY: "$currency"
+    }
+    pipeline += [
+        {"$group": {
+            "_id": {"period": rollup_period(interval), "group": group_fields.get(group_by)},
+            "value": {"$sum": value}
+        }},
+        {"$sort": {"_id.period": 1, "_id.group": 1}}
+    ]
+    rows = await db.analytics_daily.aggregate(pipeline).to_list(None)
+    
+    return {
+        "metric": metric,
+        "interval": interval,
+        "group_by": group_by,
+        "series": [
+            {"period": row["_id"]["period"], "group": row["_id"]["group"], "value": row["value"]}
+            for row in rows
         ]
-    }).to_list(100)
+    }
+
+@api_router.get("/analytics/timeseries/transitions")
+async def get_status_transition_timeseries(
+    interval: TimeseriesInterval = TimeseriesInterval.DAY,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    clinic_id: Optional[str] = None,
+    currency: Optional[Currency] = None,
+    current_user: Principal = Depends(get_admin_user)
+):
+    """Number of bookings moved into each status per day/week/month"""
+    rows = await db.analytics_daily.aggregate([
+        {"$match": rollup_match(date_from, date_to, clinic_id, currency)},
+        {"$project": {"date": 1, "transitions": {"$objectToArray": {"$ifNull": ["$transitions", {}]}}}},
+        {"$unwind": "$transitions"},
+        {"$group": {
+            "_id": {"period": rollup_period(interval), "status": "$transitions.k"},
+            "count": {"$sum": "$transitions.v"}
+        }},
+        {"$sort": {"_id.period": 1, "_id.status": 1}}
+    ]).to_list(None)
     
-    return [Clinic(**clinic) for clinic in clinics]
+    return {
+        "interval": interval,
+        "series": [
+            {"period": row["_id"]["period"], "status": row["_id"]["status"], "count": row["count"]}
+            for row in rows
+        ]
+    }
+
+@api_router.post("/analytics/rollups/rebuild")
+async def rebuild_analytics_rollups_endpoint(current_user: Principal = Depends(get_admin_user)):
+    rollup_days = await rebuild_analytics_rollups()
+    await rebuild_booking_status_counts()
+    return {"message": "Analytics rollups rebuilt successfully", "rollup_documents": rollup_days}
+
+# Search suggestions
+SEARCH_STOPWORDS = {
+    Language.EN: {"a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with"},
+    Language.FR: {"au", "aux", "avec", "de", "des", "du", "en", "et", "la", "le", "les", "pour", "sur", "un", "une"},
+}
+
+def search_tokens(text: str, language: Optional[Language] = None, partial_last: bool = False) -> List[str]:
+    """Lowercased, accent-folded words; splitting on apostrophes drops French elisions (l', d')"""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    stopwords = SEARCH_STOPWORDS[language] if language else set().union(*SEARCH_STOPWORDS.values())
+    words = re.split(r"[^a-z0-9]+", folded)
+    tokens = [word for word in words if len(word) > 1 and word not in stopwords]
+    # A word still being typed may be the start of a longer one, so keep it even if short or a stopword
+    if partial_last and words[-1] and (len(words[-1]) == 1 or words[-1] in stopwords):
+        tokens.append(words[-1])
+    return tokens
+
+def trigrams(token: str) -> set:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SuggestionIndex:
+    """In-process prefix and trigram index over test and clinic names, categories, locations and services"""
+
+    # Field weights: a hit on the name outranks one on a category, location or service
+    FIELDS = {
+        "test": {"name": 3, "category": 1},
+        "clinic": {"name": 3, "location": 1, "services": 1},
+    }
+    DETAIL_FIELDS = {"test": "category", "clinic": "location"}
+
+    def __init__(self):
+        self.edits = 0  # Lets a rebuild tell whether the index changed while it was reading
+        self._documents: Dict[Tuple[str, str], dict] = {}
+        self._postings: Dict[str, Dict[Tuple[str, str], Tuple[int, str]]] = defaultdict(dict)
+        self._prefixes: Dict[str, set] = defaultdict(set)
+        self._trigrams: Dict[str, set] = defaultdict(set)
+
+    def add(self, kind: str, document: dict):
+        key = (kind, document["id"])
+        self.remove(kind, document["id"])
+        self.edits += 1
+        self._documents[key] = {
+            "type": kind,
+            "id": document["id"],
+            "label": document["name"],
+            "detail": document.get(self.DETAIL_FIELDS[kind])
+        }
+        for field, weight in self.FIELDS[kind].items():
+            value = document.get(field) or ""
+            text = " ".join(value) if isinstance(value, list) else value
+            for token in search_tokens(text):
+                previous = self._postings[token].get(key)
+                if previous is None or previous[0] < weight:
+                    self._postings[token][key] = (weight, field)
+                if len(self._postings[token]) == 1:
+                    self._add_token(token)
+
+    def remove(self, kind: str, document_id: str):
+        key = (kind, document_id)
+        if self._documents.pop(key, None) is None:
+            return
+        self.edits += 1
+        for token in [t for t, postings in self._postings.items() if key in postings]:
+            del self._postings[token][key]
+            if not self._postings[token]:
+                del self._postings[token]
+                self._remove_token(token)
+
+    def _add_token(self, token: str):
+        for length in range(1, min(len(token), SUGGEST_MAX_PREFIX_LENGTH) + 1):
+            self._prefixes[token[:length]].add(token)
+        for gram in trigrams(token):
+            self._trigrams[gram].add(token)
+
+    def _remove_token(self, token: str):
+        for length in range(1, min(len(token), SUGGEST_MAX_PREFIX_LENGTH) + 1):
+            self._prefixes[token[:length]].discard(token)
+        for gram in trigrams(token):
+            self._trigrams[gram].discard(token)
+
+    def _matching_tokens(self, word: str) -> Dict[str, float]:
+        """Indexed tokens for one query word: prefix matches first, trigram-similar ones for typos"""
+        matches = {
+            token: 1.0 if token == word else 0.8
+            for token in self._prefixes.get(word[:SUGGEST_MAX_PREFIX_LENGTH], ())
+            if token.startswith(word)
+        }
+        if matches or len(word) < 3:
+            return matches
+        word_grams = trigrams(word)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in word_grams:
+            for token in self._trigrams.get(gram, ()):
+                shared[token] += 1
+        for token, count in shared.items():
+            similarity = count / len(word_grams | trigrams(token))
+            if similarity >= SUGGEST_MIN_TRIGRAM_SIMILARITY:
+                matches[token] = 0.6 * similarity
+        return matches
+
+    def suggest(self, query: str, language: Optional[Language], limit: int) -> List[SearchSuggestion]:
+        words = search_tokens(query, language, partial_last=True)
+        if not words:
+            return []
+        scores: Optional[Dict[Tuple[str, str], float]] = None
+        matched_fields: Dict[Tuple[str, str], str] = {}
+        # Every query word has to match something in a document for it to be suggested
+        for word in words:
+            word_scores: Dict[Tuple[str, str], float] = {}
+            for token, closeness in self._matching_tokens(word).items():
+                for key, (weight, field) in self._postings[token].items():
+                    if weight * closeness > word_scores.get(key, 0):
+                        word_scores[key] = weight * closeness
+                        if key not in matched_fields or field == "name":
+                            matched_fields[key] = field
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {key: score + word_scores[key] for key, score in scores.items() if key in word_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda key: (-scores[key], self._documents[key]["label"]))[:limit]
+        return [
+            SearchSuggestion(**self._documents[key], matched_field=matched_fields[key])
+            for key in ranked
+        ]
+
+    @classmethod
+    async def build(cls) -> "SuggestionIndex":
+        tests = await db.tests.find({}, {"_id": 0, "id": 1, "name": 1, "category": 1}).to_list(None)
+        clinics = await db.clinics.find(
+            {}, {"_id": 0, "id": 1, "name": 1, "location": 1, "services": 1}
+        ).to_list(None)
+        index = cls()
+        for test in tests:
+            index.add("test", test)
+        for clinic in clinics:
+            index.add("clinic", clinic)
+        return index
+
+suggestion_index = SuggestionIndex()
+suggestion_refresh_task: Optional[asyncio.Task] = None
+
+async def refresh_suggestion_index():
+    """Build a fresh index off to the side and swap it in whole"""
+    global suggestion_index
+    while True:
+        edits = (suggestion_index, suggestion_index.edits)
+        fresh = await SuggestionIndex.build()
+        # A local edit made while reading may be missing from the fresh index, so read again
+        if edits == (suggestion_index, suggestion_index.edits):
+            suggestion_index = fresh
+            return
+
+async def refresh_suggestion_index_periodically():
+    # Other workers' catalog edits only reach this index through these refreshes
+    while True:
+        await asyncio.sleep(SUGGEST_INDEX_MAX_AGE_SECONDS)
+        try:
+            await refresh_suggestion_index()
+        except Exception as e:
+            logger.error(f"Error refreshing search suggestion index: {e}")
+
+@api_router.get("/search/suggest", response_model=List[SearchSuggestion])
+async def search_suggest(
+    query: str,
+    language: Optional[Language] = None,
+    limit: int = Query(8, ge=1, le=25)
+):
+    """Autocomplete over test and clinic names from the in-process index"""
+    return suggestion_index.suggest(query, language, limit)
+
+# Search endpoints
+async def search_catalog(collection, query: str, prefix_fields: List[str], offset: int, limit: int) -> Tuple[List[dict], Optional[int]]:
+    """Relevance-ranked $text search, or an anchored name prefix match for very short queries"""
+    query = query.strip()
+    if not query:
+        return [], None
+    if len(query) < SEARCH_MIN_TEXT_QUERY_LENGTH:
+        prefix = {"$regex": f"^{re.escape(query)}", "$options": "i"}
+        cursor = collection.find(
+            {"$or": [{field: prefix} for field in prefix_fields]}, {"_id": 0}
+        ).sort("name", ASCENDING)
+    else:
+        cursor = collection.find(
+            {"$text": {"$search": query}}, {"_id": 0, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"}), ("id", ASCENDING)])
+    documents = await cursor.skip(offset).limit(limit + 1).to_list(limit + 1)
+    next_offset = offset + limit if len(documents) > limit else None
+    return documents[:limit], next_offset
+
+@api_router.get("/search/tests", response_model=TestSearchPage)
+async def search_tests(
+    query: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    tests, next_offset = await search_catalog(db.tests, query, ["name", "category"], offset, limit)
+    return TestSearchPage(tests=[Test(**test) for test in tests], next_offset=next_offset)
+
+@api_router.get("/search/clinics", response_model=ClinicSearchPage)
+async def search_clinics(
+    query: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    clinics, next_offset = await search_catalog(db.clinics, query, ["name", "location"], offset, limit)
+    return ClinicSearchPage(clinics=[Clinic(**clinic) for clinic in clinics], next_offset=next_offset)
 
 # Public endpoints for patients (no authentication required)
 @api_router.get("/public/tests", response_model=List[Test])
-async def get_public_tests():
-    tests = await db.tests.find().to_list(1000)
-    return [Test(**test) for test in tests]
+async def get_public_tests(if_none_match: Optional[str] = Header(None)):
+    return await catalog_response("tests", load_tests_catalog, if_none_match)
 
 @api_router.get("/public/clinics", response_model=List[Clinic])
-async def get_public_clinics():
-    clinics = await db.clinics.find().to_list(1000)
-    return [Clinic(**clinic) for clinic in clinics]
+async def get_public_clinics(if_none_match: Optional[str] = Header(None)):
+    return await catalog_response("clinics", load_clinics_catalog, if_none_match)
 
 @api_router.get("/public/tests/{test_id}/pricing")
 async def get_public_test_pricing(test_id: str):
     return await get_test_pricing_by_test(test_id)
 
-@api_router.get("/public/clinics/{clinic_id}/tests")
+@api_router.get("/public/clinics/{clinic_id}/tests", response_model=ClinicTestCatalog)
 async def get_public_clinic_tests(clinic_id: str):
     return await get_clinic_tests(clinic_id)
 
 # New endpoints for test provider flow
-@api_router.get("/public/tests/{test_id}/providers")
-async def get_test_providers(test_id: str):
+@api_router.get("/public/tests/{test_id}/providers", response_model=List[Clinic])
+async def get_test_providers(test_id: str, if_none_match: Optional[str] = Header(None)):
     """Get all providers that offer a specific test"""
-    pricing_records = await db.test_pricing.find({"test_id": test_id, "is_available": True}).to_list(1000)
-    
-    provider_ids = [record["clinic_id"] for record in pricing_records]
-    providers = await db.clinics.find({"id": {"$in": provider_ids}}).to_list(1000)
+    async def load_providers():
+        pricing_records = await db.test_pricing.find({"test_id": test_id, "is_available": True}).to_list(1000)
+        
+        provider_ids = [record["clinic_id"] for record in pricing_records]
+        providers = await db.clinics.find({"id": {"$in": provider_ids}}).to_list(1000)
+        
+        return [Clinic(**provider) for provider in providers]
     
-    return [Clinic(**provider) for provider in providers]
+    return await catalog_response(f"providers:{test_id}", load_providers, if_none_match)
 
-@api_router.get("/public/tests/{test_id}/pricing/{provider_id}")
-async def get_test_provider_pricing(test_id: str, provider_id: str):
+@api_router.get("/public/tests/{test_id}/pricing/{provider_id}", response_model=TestPricing)
+async def get_test_provider_pricing(test_id: str, provider_id: str, if_none_match: Optional[str] = Header(None)):
     """Get pricing for a specific test from a specific provider"""
-    pricing = await db.test_pricing.find_one({
-        "test_id": test_id,
-        "clinic_id": provider_id,
-        "is_available": True
-    })
-    
-    if not pricing:
-        raise HTTPException(status_code=404, detail="Pricing not found")
+    async def load_pricing():
+        pricing = await db.test_pricing.find_one({
+            "test_id": test_id,
+            "clinic_id": provider_id,
+            "is_available": True
+        })
+        
+        if not pricing:
+            raise HTTPException(status_code=404, detail="Pricing not found")
+        
+        return TestPricing(**with_lrd_price(pricing, await get_lrd_rate()))
     
-    return TestPricing(**pricing)
+    return await catalog_response(f"pricing:{test_id}:{provider_id}", load_pricing, if_none_match)
 
 @api_router.get("/public/tests/{test_id}")
 async def get_test_details(test_id: str):
@@ -793,22 +2904,38 @@ async def get_test_details(test_id: str):
 
 # User Management endpoints (Admin only)
 @api_router.get("/users", response_model=List[User])
-async def get_all_users(current_user: User = Depends(get_admin_user)):
+async def get_all_users(current_user: Principal = Depends(get_admin_user)):
     users = await db.users.find().to_list(1000)
     return [User(**user) for user in users]
 
 @api_router.put("/users/{user_id}")
-async def update_user(user_id: str, update_data: dict, current_user: User = Depends(get_admin_user)):
+async def update_user(user_id: str, update_data: dict, current_user: Principal = Depends(get_admin_user)):
     update_data['updated_at'] = datetime.utcnow()
+    update_data.pop('token_version', None)
     
-    result = await db.users.update_one({"id": user_id}, {"$set": update_data})
-    if result.modified_count == 0:
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, **{field: 1 for field in TOKEN_REVOKING_USER_FIELDS}})
+    if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    # Bumping the token version revokes tokens issued before a change to who the user is or may do;
+    # contact details and the like leave existing sessions alone
+    revoke = any(
+        field in update_data and update_data[field] != user.get(field)
+        for field in TOKEN_REVOKING_USER_FIELDS
+    )
+    changes = {"$set": update_data}
+    if revoke:
+        changes["$inc"] = {"token_version": 1}
+    result = await db.users.update_one({"id": user_id}, changes)
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    if revoke:
+        await mark_principal_changed(user_id)
+    
     return {"message": "User updated successfully"}
 
 @api_router.delete("/users/{user_id}")
-async def delete_user(user_id: str, current_user: User = Depends(get_admin_user)):
+async def delete_user(user_id: str, current_user: Principal = Depends(get_admin_user)):
     # Don't allow deletion of current admin
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
@@ -816,17 +2943,13 @@ async def delete_user(user_id: str, current_user: User = Depends(get_admin_user)
     result = await db.users.delete_one({"id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    await mark_principal_changed(user_id)
     
     return {"message": "User deleted successfully"}
 
 # Surgery Inquiry Management endpoints
-@api_router.get("/surgery-inquiries", response_model=List[SurgeryInquiry])
-async def get_surgery_inquiries(current_user: User = Depends(get_admin_user)):
-    inquiries = await db.surgery_inquiries.find().to_list(1000)
-    return [SurgeryInquiry(**inquiry) for inquiry in inquiries]
-
 @api_router.put("/surgery-inquiries/{inquiry_id}")
-async def update_surgery_inquiry(inquiry_id: str, update_data: dict, current_user: User = Depends(get_admin_user)):
+async def update_surgery_inquiry(inquiry_id: str, update_data: dict, current_user: Principal = Depends(get_admin_user)):
     update_data['updated_at'] = datetime.utcnow()
     
     result = await db.surgery_inquiries.update_one({"id": inquiry_id}, {"$set": update_data})
@@ -836,7 +2959,7 @@ async def update_surgery_inquiry(inquiry_id: str, update_data: dict, current_use
     return {"message": "Surgery inquiry updated successfully"}
 
 @api_router.delete("/surgery-inquiries/{inquiry_id}")
-async def delete_surgery_inquiry(inquiry_id: str, current_user: User = Depends(get_admin_user)):
+async def delete_surgery_inquiry(inquiry_id: str, current_user: Principal = Depends(get_admin_user)):
     result = await db.surgery_inquiries.delete_one({"id": inquiry_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Surgery inquiry not found")
@@ -861,15 +2984,180 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Database indexes the API's queries rely on, keyed by collection
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "tests": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("name", TEXT), ("category", TEXT), ("description", TEXT)],
+            name="search_text", weights={"name": 10, "category": 5, "description": 1},
+            default_language="none"
+        ),
+    ],
+    "clinics": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+        IndexModel(
+            [("name", TEXT), ("location", TEXT), ("services", TEXT), ("description", TEXT)],
+            name="search_text", weights={"name": 10, "location": 5, "services": 5, "description": 1},
+            default_language="none"
+        ),
+    ],
+    "test_pricing": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("test_id", ASCENDING), ("clinic_id", ASCENDING)], name="test_clinic_unique", unique=True),
+        IndexModel([("test_id", ASCENDING), ("is_available", ASCENDING)], name="test_available"),
+        IndexModel([("clinic_id", ASCENDING), ("is_available", ASCENDING)], name="clinic_available"),
+    ],
+    "test_providers": [
+        IndexModel([("test_id", ASCENDING)], name="test_id_unique", unique=True),
+        IndexModel([("providers.clinic_id", ASCENDING)], name="provider_clinic_id"),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("booking_number", ASCENDING)], name="booking_number_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("clinic_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="clinic_created_at_id"
+        ),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+    ],
+    "booking_status_counts": [
+        IndexModel(
+            [("clinic_id", ASCENDING), ("currency", ASCENDING), ("status", ASCENDING)],
+            name="clinic_currency_status_unique", unique=True
+        ),
+    ],
+    "token_revocations": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "feedback": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("booking_id", ASCENDING)], name="booking_id"),
+        IndexModel(
+            [("clinic_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="clinic_created_at_id"
+        ),
+    ],
+    "surgery_inquiries": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "exchange_rates": [
+        IndexModel([("effective_at", DESCENDING)], name="effective_at"),
+    ],
+    "analytics_daily": [
+        IndexModel(
+            [("date", ASCENDING), ("clinic_id", ASCENDING), ("currency", ASCENDING)],
+            name="date_clinic_currency_unique", unique=True
+        ),
+        IndexModel([("clinic_id", ASCENDING), ("date", ASCENDING)], name="clinic_date"),
+    ],
+}
+
+def _index_key(key) -> List[Tuple[str, object]]:
+    items = key.items() if hasattr(key, "items") else key
+    return [(field, direction if isinstance(direction, str) else int(direction)) for field, direction in items]
+
+def _index_matches(current: dict, spec: dict) -> bool:
+    # MongoDB reports text indexes as _fts/_ftsx keys, so compare their field weights instead
+    if "weights" in spec:
+        return dict(current.get("weights", {})) == dict(spec["weights"])
+    return _index_key(current["key"]) == _index_key(spec["key"])
+
+async def ensure_indexes() -> Dict[str, dict]:
+    """Create missing registry indexes and report drift from what MongoDB already has"""
+    report = {}
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        created, drifted = [], []
+
+        for index in indexes:
+            spec = index.document
+            current = existing.get(spec["name"])
+            if current is None:
+                try:
+                    await collection.create_indexes([index])
+                    created.append(spec["name"])
+                except OperationFailure as e:
+                    logger.error(f"Could not create index {collection_name}.{spec['name']}: {e}")
+                    drifted.append(spec["name"])
+            elif (not _index_matches(current, spec)
+                    or current.get("unique", False) != spec.get("unique", False)):
+                drifted.append(spec["name"])
+
+        declared = {index.document["name"] for index in indexes} | {"_id_"}
+        unexpected = sorted(set(existing) - declared)
+        report[collection_name] = {"created": created, "drifted": drifted, "unexpected": unexpected}
+
+        if created:
+            logger.info(f"Created indexes on {collection_name}: {', '.join(created)}")
+        if drifted or unexpected:
+            logger.warning(
+                f"Index drift on {collection_name}: drifted={drifted} unexpected={unexpected}"
+            )
+    return report
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize default users on startup"""
+    """Ensure indexes and initialize default users on startup"""
+    global suggestion_refresh_task
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.error(f"Error ensuring database indexes: {e}")
+
+    try:
+        await backfill_feedback_clinics()
+    except Exception as e:
+        logger.error(f"Error backfilling feedback clinic ids: {e}")
+
+    try:
+        migrated = await migrate_legacy_result_files()
+        if migrated:
+            logger.info(f"Moved legacy result files of {migrated} bookings into result storage")
+    except Exception as e:
+        logger.error(f"Error migrating legacy result files: {e}")
+
+    try:
+        if not await db.booking_status_counts.find_one({}) and await db.bookings.find_one({}):
+            await rebuild_booking_status_counts()
+    except Exception as e:
+        logger.error(f"Error counting bookings by status: {e}")
+
+    try:
+        await current_exchange_rate.load()
+    except Exception as e:
+        logger.error(f"Error loading exchange rate: {e}")
+
+    try:
+        await token_revocations.load()
+    except Exception as e:
+        logger.error(f"Error loading token revocations: {e}")
+
+    try:
+        await refresh_test_providers()
+    except Exception as e:
+        logger.error(f"Error building test providers view: {e}")
+
+    try:
+        await refresh_suggestion_index()
+    except Exception as e:
+        logger.error(f"Error building search suggestion index: {e}")
+    suggestion_refresh_task = asyncio.create_task(refresh_suggestion_index_periodically())
+
     try:
         # Check if sub-admin user exists
         existing_subadmin = await db.users.find_one({"email": "subadmin@chekup.com"})
         if not existing_subadmin:
             # Create default sub-admin user
-            hashed_password = pwd_context.hash("SubAdminPass123!")
+            hashed_password = await get_password_hash("SubAdminPass123!")
             subadmin_user = {
                 "id": str(uuid.uuid4()),
                 "name": "ChekUp Sub Administrator",
@@ -892,4 +3180,7 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    if suggestion_refresh_task:
+        suggestion_refresh_task.cancel()
+    client.close()
+    password_hasher.shutdown()
\ No newline at end of file
@@ -353,7 +353,7 @@ class ChekUpTester:
         clinic_id = self.test_data["clinic_id"]
         response = self.make_request("GET", f"/clinics/{clinic_id}/tests")
         if response.status_code == 200:
-            clinic_tests = response.json()
+            clinic_tests = response.json()["tests"]
             self.log_result("Get Clinic Tests", True, f"Retrieved {len(clinic_tests)} tests for clinic")
         else:
             self.log_result("Get Clinic Tests", False, f"Status: {response.status_code}")
@@ -396,7 +396,7 @@ class ChekUpTester:
             headers = {"Authorization": f"Bearer {self.admin_token}"}
             response = self.make_request("GET", "/bookings", headers=headers)
             if response.status_code == 200:
-                bookings = response.json()
+                bookings = response.json()["bookings"]
                 self.log_result("Admin View All Bookings", True, f"Admin retrieved {len(bookings)} bookings")
             else:
                 self.log_result("Admin View All Bookings", False, f"Status: {response.status_code}")
@@ -496,7 +496,7 @@ class ChekUpTester:
         clinic_id = self.test_data["clinic_id"]
         response = self.make_request("GET", f"/feedback/clinic/{clinic_id}")
         if response.status_code == 200:
-            feedback_list = response.json()
+            feedback_list = response.json()["feedback"]
             self.log_result("Get Clinic Feedback", True, f"Retrieved {len(feedback_list)} feedback entries")
         else:
             self.log_result("Get Clinic Feedback", False, f"Status: {response.status_code}")
@@ -602,7 +602,7 @@ class ChekUpTester:
         # Search tests
         response = self.make_request("GET", "/search/tests", {"query": "blood"})
         if response.status_code == 200:
-            tests = response.json()
+            tests = response.json()["tests"]
             self.log_result("Search Tests", True, f"Found {len(tests)} tests matching 'blood'")
         else:
             self.log_result("Search Tests", False, f"Status: {response.status_code}")
@@ -610,7 +610,7 @@ class ChekUpTester:
         # Search clinics
         response = self.make_request("GET", "/search/clinics", {"query": "medical"})
         if response.status_code == 200:
-            clinics = response.json()
+            clinics = response.json()["clinics"]
             self.log_result("Search Clinics", True, f"Found {len(clinics)} clinics matching 'medical'")
         else:
             self.log_result("Search Clinics", False, f"Status: {response.status_code}")
@@ -652,7 +652,7 @@ class ChekUpTester:
             clinic_id = self.test_data["clinic_id"]
             response = self.make_request("GET", f"/public/clinics/{clinic_id}/tests")
             if response.status_code == 200:
-                tests = response.json()
+                tests = response.json()["tests"]
                 self.log_result("Public Clinic Tests", True, f"Retrieved {len(tests)} tests for clinic")
             else:
                 self.log_result("Public Clinic Tests", False, f"Status: {response.status_code}")
@@ -732,7 +732,7 @@ class ChekUpTester:
         # Test sub-admin can view all bookings (like admin)
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             self.log_result("Sub-Admin View All Bookings", True, 
                           f"Sub-admin can view all bookings ({len(bookings)} bookings)")
         else:
@@ -1430,7 +1430,7 @@ class ChekUpTester:
         # Test provider (clinic) can view assigned bookings
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             self.log_result("Provider View Assigned Bookings", True, 
                           f"Provider can view {len(bookings)} assigned bookings")
         else:
@@ -1562,6 +1562,746 @@ class ChekUpTester:
         
         return True
 
+    def create_sample_booking(self, patient_name: str) -> Optional[str]:
+        """Create a pending booking for the shared test and clinic, returning its id"""
+        booking_data = {
+            "patient_name": patient_name,
+            "patient_phone": "+231-777-246810",
+            "patient_location": "Sinkor, Monrovia",
+            "test_ids": [self.test_data["test_id"]],
+            "clinic_id": self.test_data["clinic_id"],
+            "delivery_method": "in_person",
+            "preferred_currency": "USD"
+        }
+        response = self.make_request("POST", "/bookings", booking_data)
+        if response.status_code in [200, 201]:
+            return response.json()["id"]
+        return None
+
+    def test_booking_status_transitions(self):
+        """Test that bookings only move along allowed status transitions"""
+        print("\n=== Testing Booking Status Transitions ===")
+        
+        if not self.admin_token or not self.test_data.get("test_id") or not self.test_data.get("clinic_id"):
+            self.log_result("Booking Status Transitions", False, "Missing required token, test or clinic data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        booking_id = self.create_sample_booking("Transition Check Patient")
+        if not booking_id:
+            self.log_result("Transition Booking Setup", False, "Could not create booking")
+            return False
+        
+        response = self.make_request("PUT", f"/bookings/{booking_id}/status", {"status": "completed"}, headers)
+        if response.status_code == 200:
+            self.log_result("Allowed Status Transition", True, "Pending booking moved to completed")
+        else:
+            self.log_result("Allowed Status Transition", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        
+        # Completed bookings are final
+        response = self.make_request("PUT", f"/bookings/{booking_id}/status", {"status": "pending"}, headers)
+        if response.status_code == 409:
+            self.log_result("Disallowed Status Transition", True, f"Completed to pending rejected: {response.json().get('detail')}")
+        else:
+            self.log_result("Disallowed Status Transition", False, f"Expected 409, got {response.status_code}")
+        
+        # Uploading results follows the same table, so a completed booking cannot take new ones
+        response = self.make_request("POST", f"/bookings/{booking_id}/upload-results", headers=headers,
+                                     files={"files": ("late_result.txt", b"late result", "text/plain")})
+        if response.status_code == 409:
+            self.log_result("Upload To Completed Booking", True, "Upload to completed booking rejected")
+        else:
+            self.log_result("Upload To Completed Booking", False, f"Expected 409, got {response.status_code}")
+        
+        return True
+
+    def test_bulk_booking_update(self):
+        """Test bulk status changes and assignment with per-booking results"""
+        print("\n=== Testing Bulk Booking Update ===")
+        
+        if not self.admin_token or not self.test_data.get("test_id") or not self.test_data.get("clinic_id"):
+            self.log_result("Bulk Booking Update", False, "Missing required token, test or clinic data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        booking_ids = [self.create_sample_booking(f"Bulk Update Patient {i}") for i in range(2)]
+        if None in booking_ids:
+            self.log_result("Bulk Update Setup", False, "Could not create bookings")
+            return False
+        missing_id = "00000000-0000-0000-0000-000000000000"
+        
+        response = self.make_request("POST", "/bookings/bulk-update", {
+            "booking_ids": booking_ids + [missing_id],
+            "status": "confirmed"
+        }, headers)
+        if response.status_code == 200:
+            result = response.json()
+            rows = {row["booking_id"]: row for row in result["results"]}
+            if (result["updated"] == 2 and all(rows[booking_id]["success"] for booking_id in booking_ids)
+                    and not rows[missing_id]["success"]):
+                self.log_result("Bulk Status Update Results", True, f"2 confirmed, missing booking reported: {rows[missing_id]['error']}")
+            else:
+                self.log_result("Bulk Status Update Results", False, f"Unexpected results: {result}")
+        else:
+            self.log_result("Bulk Status Update Results", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        
+        # Confirmed bookings cannot go back to pending; each row says so
+        response = self.make_request("POST", "/bookings/bulk-update", {
+            "booking_ids": booking_ids,
+            "status": "pending"
+        }, headers)
+        if response.status_code == 200 and response.json()["updated"] == 0:
+            self.log_result("Bulk Disallowed Transition", True, response.json()["results"][0]["error"])
+        else:
+            self.log_result("Bulk Disallowed Transition", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        # Bookings can only be assigned to staff, and an explicit null unassigns them
+        response = self.make_request("GET", "/users", headers=headers)
+        users = response.json() if response.status_code == 200 else []
+        admin_id = next((user["id"] for user in users if user.get("email") == "admin@chekup.com"), None)
+        clinic_user_id = next((user["id"] for user in users if user.get("role") == "clinic"), None)
+        
+        if admin_id:
+            response = self.make_request("POST", "/bookings/bulk-update", {
+                "booking_ids": booking_ids, "assigned_to": admin_id
+            }, headers)
+            if response.status_code == 200 and response.json()["updated"] == 2:
+                self.log_result("Bulk Assign To Staff", True, "Bookings assigned to admin")
+            else:
+                self.log_result("Bulk Assign To Staff", False, f"Status: {response.status_code}, Response: {response.text}")
+            
+            response = self.make_request("POST", "/bookings/bulk-update", {
+                "booking_ids": booking_ids, "assigned_to": None
+            }, headers)
+            booking = self.make_request("GET", f"/bookings/{booking_ids[0]}", headers=headers).json()
+            if response.status_code == 200 and booking.get("assigned_to") is None:
+                self.log_result("Bulk Clear Assignment", True, "Assignment cleared with explicit null")
+            else:
+                self.log_result("Bulk Clear Assignment", False, f"Status: {response.status_code}, assigned_to: {booking.get('assigned_to')}")
+        
+        if clinic_user_id:
+            response = self.make_request("POST", "/bookings/bulk-update", {
+                "booking_ids": booking_ids, "assigned_to": clinic_user_id
+            }, headers)
+            if response.status_code == 400:
+                self.log_result("Bulk Assign To Clinic Rejected", True, "Clinic accounts cannot be assignees")
+            else:
+                self.log_result("Bulk Assign To Clinic Rejected", False, f"Expected 400, got {response.status_code}")
+        
+        return True
+
+    def test_batch_cart_checkout(self):
+        """Test checking out a cart into one booking per provider"""
+        print("\n=== Testing Batch Cart Checkout ===")
+        
+        if not self.test_data.get("test_id") or not self.test_data.get("clinic_id"):
+            self.log_result("Batch Cart Checkout", False, "Missing required test or clinic data")
+            return False
+        
+        checkout_data = {
+            "patient_name": "Grace Kollie",
+            "patient_phone": "+231-777-975310",
+            "patient_location": "Paynesville, Monrovia",
+            "delivery_method": "whatsapp",
+            "preferred_currency": "USD",
+            "delivery_charge": 5.00,
+            "items": [{"test_id": self.test_data["test_id"], "clinic_id": self.test_data["clinic_id"]}]
+        }
+        
+        response = self.make_request("POST", "/bookings/batch", checkout_data)
+        if response.status_code == 200:
+            result = response.json()
+            booking = result["bookings"][0]
+            expected_total = sum(booking["test_prices"].values()) + 5.00
+            if len(result["booking_numbers"]) == 1 and abs(result["total_amount"] - expected_total) < 0.01:
+                self.log_result("Batch Cart Checkout", True, f"Booking {result['booking_numbers'][0]}, Total: ${result['total_amount']}")
+            else:
+                self.log_result("Batch Cart Checkout", False, f"Unexpected result: {result}")
+        else:
+            self.log_result("Batch Cart Checkout", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        # Unpriced tests are rejected before anything is written
+        checkout_data["items"] = [{"test_id": "00000000-0000-0000-0000-000000000000", "clinic_id": self.test_data["clinic_id"]}]
+        response = self.make_request("POST", "/bookings/batch", checkout_data)
+        if response.status_code == 400:
+            self.log_result("Batch Checkout Unpriced Test", True, "Unpriced test rejected")
+        else:
+            self.log_result("Batch Checkout Unpriced Test", False, f"Expected 400, got {response.status_code}")
+        
+        checkout_data["items"] = [{"test_id": self.test_data["test_id"], "clinic_id": self.test_data["clinic_id"]}] * 101
+        response = self.make_request("POST", "/bookings/batch", checkout_data)
+        if response.status_code == 422:
+            self.log_result("Batch Checkout Size Limit", True, "Cart over 100 items rejected")
+        else:
+            self.log_result("Batch Checkout Size Limit", False, f"Expected 422, got {response.status_code}")
+        
+        return True
+
+    def test_pricing_import_export(self):
+        """Test that an exported pricing file imports back cleanly"""
+        print("\n=== Testing Pricing Import/Export ===")
+        
+        if not self.admin_token or not self.test_data.get("test_id"):
+            self.log_result("Pricing Import/Export", False, "Missing required token or test data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        response = self.make_request("GET", "/test-pricing/export", {"format": "csv"}, headers)
+        if response.status_code != 200:
+            self.log_result("Pricing Export", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        exported = response.text
+        row_count = len([line for line in exported.splitlines()[1:] if line.strip()])
+        self.log_result("Pricing Export", True, f"Exported {row_count} pricing rows")
+        
+        response = self.make_request("POST", "/test-pricing/import?format=csv", headers=headers,
+                                     files={"file": ("test_pricing.csv", exported.encode("utf-8"), "text/csv")})
+        if response.status_code == 200:
+            report = response.json()
+            # Rows for since-deleted tests or clinics come back as row errors, never as new rows
+            if report["processed"] == row_count and report["inserted"] == 0 and report["updated"] + report["error_count"] == row_count:
+                self.log_result("Pricing Import Round Trip", True, f"Re-imported {report['updated']} of {report['processed']} rows, {report['error_count']} row errors")
+            else:
+                self.log_result("Pricing Import Round Trip", False, f"Unexpected report: {report}")
+        else:
+            self.log_result("Pricing Import Round Trip", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        bad_file = "test_id,clinic_id,price_usd\nunknown-test,unknown-clinic,10\n"
+        response = self.make_request("POST", "/test-pricing/import?format=csv", headers=headers,
+                                     files={"file": ("bad.csv", bad_file.encode("utf-8"), "text/csv")})
+        if response.status_code == 200 and response.json()["errors"][0]["row"] == 2:
+            self.log_result("Pricing Import Row Errors", True, response.json()["errors"][0]["error"])
+        else:
+            self.log_result("Pricing Import Row Errors", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        response = self.make_request("POST", "/test-pricing/import?format=csv", headers=headers,
+                                     files={"file": ("latin1.csv", "test_id,clinic_id,price_usd\né,x,1\n".encode("latin-1"), "text/csv")})
+        if response.status_code == 400:
+            self.log_result("Pricing Import Encoding Check", True, "Non UTF-8 file rejected")
+        else:
+            self.log_result("Pricing Import Encoding Check", False, f"Expected 400, got {response.status_code}")
+        
+        return True
+
+    def test_catalog_etag(self):
+        """Test conditional GETs on the public catalog"""
+        print("\n=== Testing Catalog ETags ===")
+        
+        response = self.make_request("GET", "/public/tests")
+        etag = response.headers.get("ETag")
+        if response.status_code != 200 or not etag:
+            self.log_result("Catalog ETag", False, f"Status: {response.status_code}, ETag: {etag}")
+            return False
+        self.log_result("Catalog ETag", True, f"ETag: {etag}")
+        
+        response = self.make_request("GET", "/public/tests", headers={"If-None-Match": etag})
+        if response.status_code == 304 and not response.content:
+            self.log_result("Catalog Not Modified", True, "Matching ETag answered with 304")
+        else:
+            self.log_result("Catalog Not Modified", False, f"Expected 304, got {response.status_code}")
+        
+        return True
+
+    def test_auth_rate_limiting(self):
+        """Test that repeated logins for one email are throttled"""
+        print("\n=== Testing Auth Rate Limiting ===")
+        
+        # A fresh address so no real account is locked out
+        login_data = {"email": f"ratelimit.{int(time.time())}@test.com", "password": "wrongpassword"}
+        statuses = []
+        for _ in range(15):
+            response = self.make_request("POST", "/auth/login", login_data)
+            statuses.append(response.status_code)
+            if response.status_code == 429:
+                break
+        
+        if statuses[-1] == 429 and response.headers.get("Retry-After"):
+            self.log_result("Auth Rate Limiting", True, f"429 after {len(statuses) - 1} attempts, Retry-After: {response.headers['Retry-After']}s")
+        else:
+            self.log_result("Auth Rate Limiting", False, f"No 429 after {len(statuses)} attempts: {statuses}")
+        
+        return True
+
+    def test_result_file_download(self):
+        """Test result uploads are stored as files and served with Range support"""
+        print("\n=== Testing Result File Download ===")
+        
+        if not self.admin_token or not self.test_data.get("test_id") or not self.test_data.get("clinic_id"):
+            self.log_result("Result File Download", False, "Missing required token, test or clinic data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        booking_id = self.create_sample_booking("Result Download Patient")
+        if not booking_id:
+            self.log_result("Result Download Setup", False, "Could not create booking")
+            return False
+        
+        content = b"Hemoglobin: 13.5 g/dL\nMalaria RDT: negative\n"
+        response = self.make_request("POST", f"/bookings/{booking_id}/upload-results", headers=headers,
+                                     files={"files": ("blood panel.txt", content, "text/plain")})
+        if response.status_code == 200 and response.json()["files"][0]["length"] == len(content):
+            file_id = response.json()["files"][0]["id"]
+            self.log_result("Result File Upload", True, f"Stored {len(content)} bytes as file {file_id}")
+        else:
+            self.log_result("Result File Upload", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        
+        endpoint = f"/bookings/{booking_id}/results/{file_id}"
+        response = self.make_request("GET", endpoint, headers=headers)
+        if (response.status_code == 200 and response.content == content
+                and "filename*=UTF-8''blood%20panel.txt" in response.headers.get("Content-Disposition", "")):
+            self.log_result("Result File Full Download", True, response.headers["Content-Disposition"])
+        else:
+            self.log_result("Result File Full Download", False, f"Status: {response.status_code}, Headers: {dict(response.headers)}")
+        
+        response = self.make_request("GET", endpoint, headers={**headers, "Range": "bytes=0-9"})
+        if (response.status_code == 206 and response.content == content[:10]
+                and response.headers.get("Content-Range") == f"bytes 0-9/{len(content)}"):
+            self.log_result("Result File Range Download", True, response.headers["Content-Range"])
+        else:
+            self.log_result("Result File Range Download", False, f"Status: {response.status_code}, Headers: {dict(response.headers)}")
+        
+        response = self.make_request("GET", endpoint, headers={**headers, "Range": f"bytes={len(content)}-"})
+        if response.status_code == 416 and response.headers.get("Content-Range") == f"bytes */{len(content)}":
+            self.log_result("Unsatisfiable Range", True, "Range past the end rejected with 416")
+        else:
+            self.log_result("Unsatisfiable Range", False, f"Expected 416, got {response.status_code}")
+        
+        # Bookings still holding base64 results are moved into result storage; re-running is harmless
+        response = self.make_request("POST", "/bookings/results/migrate", headers=headers)
+        if response.status_code == 200 and isinstance(response.json().get("migrated_bookings"), int):
+            self.log_result("Legacy Result Migration", True, f"Migrated {response.json()['migrated_bookings']} bookings")
+        else:
+            self.log_result("Legacy Result Migration", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        return True
+
+    def test_booking_pagination(self):
+        """Test keyset paging of the booking list with filters and status counts"""
+        print("\n=== Testing Booking Pagination ===")
+        
+        if not self.admin_token or not self.test_data.get("test_id") or not self.test_data.get("clinic_id"):
+            self.log_result("Booking Pagination", False, "Missing required token, test or clinic data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        clinic_id = self.test_data["clinic_id"]
+        created_ids = [self.create_sample_booking(f"Pagination Patient {i}") for i in range(3)]
+        if None in created_ids:
+            self.log_result("Pagination Setup", False, "Could not create bookings")
+            return False
+        
+        # Walk the newest pages two at a time; the new bookings are the newest pending ones for the clinic
+        params = {"clinic_id": clinic_id, "status": "pending", "limit": 2}
+        seen, pages, first_page = [], 0, None
+        while pages < 10:
+            response = self.make_request("GET", "/bookings", params, headers)
+            if response.status_code != 200:
+                self.log_result("Booking Pages", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            page = response.json()
+            first_page = first_page or page
+            seen.extend(page["bookings"])
+            pages += 1
+            if not page["next_cursor"] or all(booking_id in [b["id"] for b in seen] for booking_id in created_ids):
+                break
+            params = {**params, "cursor": page["next_cursor"]}
+        
+        seen_ids = [booking["id"] for booking in seen]
+        if (len(seen_ids) == len(set(seen_ids)) and all(booking_id in seen_ids for booking_id in created_ids)
+                and all(b["status"] == "pending" and b["clinic_id"] == clinic_id for b in seen)):
+            self.log_result("Booking Pages", True, f"{len(seen_ids)} filtered bookings over {pages} pages, no repeats")
+        else:
+            self.log_result("Booking Pages", False, f"Unexpected bookings across pages: {seen_ids}")
+        
+        if pages > 1 and len(first_page["bookings"]) == 2 and "cursor" in params:
+            self.log_result("Next Cursor", True, "Full first page returned a cursor to the next one")
+        else:
+            self.log_result("Next Cursor", False, f"Expected several pages of 2, got {pages}")
+        
+        # Totals ride along with the first page only
+        if (first_page.get("status_counts") or {}).get("pending", 0) >= len(created_ids) and page.get("status_counts") is None:
+            self.log_result("Booking Status Counts", True, f"First page counts: {first_page['status_counts']}")
+        else:
+            self.log_result("Booking Status Counts", False, f"First page counts: {first_page.get('status_counts')}")
+        
+        response = self.make_request("GET", "/bookings", {"cursor": "not-a-cursor"}, headers)
+        if response.status_code == 400:
+            self.log_result("Invalid Cursor", True, "Malformed cursor rejected")
+        else:
+            self.log_result("Invalid Cursor", False, f"Expected 400, got {response.status_code}")
+        
+        # Provider dashboard totals for every clinic in one response
+        response = self.make_request("GET", "/bookings/status-counts", headers=headers)
+        if response.status_code == 200 and response.json().get(clinic_id, {}).get("pending", 0) >= len(created_ids):
+            self.log_result("Per-Clinic Status Counts", True, f"Clinic counts: {response.json()[clinic_id]}")
+        else:
+            self.log_result("Per-Clinic Status Counts", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        return True
+
+    def test_analytics_timeseries(self):
+        """Test timeseries read from the daily rollups and rebuilding them from bookings"""
+        print("\n=== Testing Analytics Timeseries ===")
+        
+        if not self.admin_token or not self.test_data.get("test_id") or not self.test_data.get("clinic_id"):
+            self.log_result("Analytics Timeseries", False, "Missing required token, test or clinic data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        clinic_id = self.test_data["clinic_id"]
+        if not self.create_sample_booking("Timeseries Patient"):
+            self.log_result("Timeseries Setup", False, "Could not create booking")
+            return False
+        
+        def clinic_bookings():
+            response = self.make_request("GET", "/analytics/timeseries", {
+                "metric": "bookings", "interval": "month", "clinic_id": clinic_id
+            }, headers)
+            if response.status_code != 200:
+                return None
+            return sum(point["value"] for point in response.json()["series"])
+        
+        bookings_before = clinic_bookings()
+        if bookings_before:
+            self.log_result("Bookings Timeseries", True, f"{bookings_before} bookings recorded for the test clinic")
+        else:
+            self.log_result("Bookings Timeseries", False, f"Expected the new booking in the series, got {bookings_before}")
+        
+        response = self.make_request("GET", "/analytics/timeseries", {
+            "metric": "revenue", "group_by": "test", "test_id": self.test_data["test_id"]
+        }, headers)
+        if response.status_code == 200 and all(point["group"] == self.test_data["test_id"] for point in response.json()["series"]):
+            self.log_result("Per-Test Revenue Timeseries", True, f"{len(response.json()['series'])} points for the test")
+        else:
+            self.log_result("Per-Test Revenue Timeseries", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        response = self.make_request("GET", "/analytics/timeseries", {"metric": "completed_revenue", "group_by": "test"}, headers)
+        if response.status_code == 400:
+            self.log_result("Completed Revenue Per Test", True, "Untracked per-test metric rejected")
+        else:
+            self.log_result("Completed Revenue Per Test", False, f"Expected 400, got {response.status_code}")
+        
+        response = self.make_request("GET", "/analytics/timeseries/transitions", {"clinic_id": clinic_id}, headers)
+        if response.status_code == 200 and any(point["status"] == "pending" for point in response.json()["series"]):
+            self.log_result("Transition Timeseries", True, f"{len(response.json()['series'])} status points")
+        else:
+            self.log_result("Transition Timeseries", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        # Rebuilding from the bookings collection must agree with the incrementally kept rollups
+        response = self.make_request("POST", "/analytics/rollups/rebuild", headers=headers)
+        if response.status_code == 200:
+            self.log_result("Rollup Rebuild", True, f"{response.json()['rollup_documents']} rollup documents rebuilt")
+        else:
+            self.log_result("Rollup Rebuild", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        
+        bookings_after = clinic_bookings()
+        if bookings_after == bookings_before:
+            self.log_result("Rebuilt Rollups Match", True, f"{bookings_after} bookings before and after rebuild")
+        else:
+            self.log_result("Rebuilt Rollups Match", False, f"{bookings_before} bookings before rebuild, {bookings_after} after")
+        
+        return True
+
+    def test_token_revocation(self):
+        """Test that role changes and deletion refuse tokens issued before them"""
+        print("\n=== Testing Token Revocation ===")
+        
+        if not self.admin_token:
+            self.log_result("Token Revocation", False, "No admin token available")
+            return False
+        
+        admin_headers = {"Authorization": f"Bearer {self.admin_token}"}
+        credentials = {"email": f"revocation-{int(time.time())}@healthcenter.lr", "password": "RevokePass123!"}
+        response = self.make_request("POST", "/auth/register", {
+            **credentials,
+            "name": "Revocation Check Clinic",
+            "phone": "+231-777-135790",
+            "location": "Paynesville, Monrovia",
+            "role": "clinic"
+        })
+        if response.status_code not in [200, 201]:
+            self.log_result("Revocation User Setup", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        user_id = response.json()["id"]
+        
+        def login_headers():
+            response = self.make_request("POST", "/auth/login", credentials)
+            return {"Authorization": f"Bearer {response.json()['access_token']}"} if response.status_code == 200 else None
+        
+        headers = login_headers()
+        if not headers or self.make_request("GET", "/bookings", headers=headers).status_code != 200:
+            self.log_result("Revocation User Login", False, "Could not use a fresh token")
+            return False
+        
+        # Contact details leave existing sessions alone
+        self.make_request("PUT", f"/users/{user_id}", {"phone": "+231-777-975310"}, admin_headers)
+        response = self.make_request("GET", "/bookings", headers=headers)
+        if response.status_code == 200:
+            self.log_result("Token Kept After Contact Change", True, "Phone change did not revoke the token")
+        else:
+            self.log_result("Token Kept After Contact Change", False, f"Expected 200, got {response.status_code}")
+        
+        self.make_request("PUT", f"/users/{user_id}", {"role": "sub_admin"}, admin_headers)
+        response = self.make_request("GET", "/bookings", headers=headers)
+        if response.status_code == 401:
+            self.log_result("Token Revoked After Role Change", True, "Token issued before the role change refused")
+        else:
+            self.log_result("Token Revoked After Role Change", False, f"Expected 401, got {response.status_code}")
+        
+        headers = login_headers()
+        if headers and self.make_request("GET", "/bookings", headers=headers).status_code == 200:
+            self.log_result("Login After Role Change", True, "New token carries the new role")
+        else:
+            self.log_result("Login After Role Change", False, "Could not log in again after role change")
+            return False
+        
+        self.make_request("DELETE", f"/users/{user_id}", headers=admin_headers)
+        response = self.make_request("GET", "/bookings", headers=headers)
+        if response.status_code == 401:
+            self.log_result("Token Revoked After Deletion", True, "Deleted user's token refused")
+        else:
+            self.log_result("Token Revoked After Deletion", False, f"Expected 401, got {response.status_code}")
+        
+        return True
+
+    def test_search_ranking(self):
+        """Test relevance ordering, offset paging and short-query prefix search"""
+        print("\n=== Testing Search Ranking ===")
+        
+        if not self.admin_token:
+            self.log_result("Search Ranking", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        word = f"rankcheck{int(time.time())}"
+        # The same word in the name, the category and the description, in expected rank order
+        tests = [
+            {"name": f"{word} Panel", "description": "Routine screening", "category": "Hematology"},
+            {"name": "Liver Function Panel", "description": "Routine screening", "category": f"{word} Chemistry"},
+            {"name": "Lipid Profile", "description": f"Includes {word} markers", "category": "Chemistry"},
+        ]
+        test_ids = []
+        for test in tests:
+            response = self.make_request("POST", "/tests", test, headers)
+            if response.status_code not in [200, 201]:
+                self.log_result("Search Ranking Setup", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            test_ids.append(response.json()["id"])
+        
+        response = self.make_request("GET", "/search/tests", {"query": word})
+        if response.status_code == 200 and [test["id"] for test in response.json()["tests"]] == test_ids:
+            self.log_result("Search Relevance Order", True, "Name match ranked over category, category over description")
+        else:
+            self.log_result("Search Relevance Order", False, f"Status: {response.status_code}, Response: {response.text}")
+        
+        paged_ids, offset = [], 0
+        while offset is not None and len(paged_ids) < len(test_ids) + 1:
+            response = self.make_request("GET", "/search/tests", {"query": word, "offset": offset, "limit": 1})
+            if response.status_code != 200:
+                break
+            paged_ids += [test["id"] for test in response.json()["tests"]]
+            offset = response.json()["next_offset"]
+        if paged_ids == test_ids and offset is None:
+            self.log_result("Search Offset Paging", True, f"{len(paged_ids)} pages of one, then no next_offset")
+        else:
+            self.log_result("Search Offset Paging", False, f"Paged ids: {paged_ids}, last next_offset: {offset}")
+        
+        # Queries too short for the text index fall back to a name prefix match
+        response = self.make_request("GET", "/search/tests", {"query": "li"})
+        found = response.json().get("tests", []) if response.status_code == 200 else None
+        names = [test["name"] for test in found] if found is not None else None
+        if (names is not None and names == sorted(names)
+                and all(test["name"].lower().startswith("li") or test["category"].lower().startswith("li") for test in found)):
+            self.log_result("Short Query Prefix Search", True, f"{len(names)} tests with a name or category starting 'li'")
+        else:
+            self.log_result("Short Query Prefix Search", False, f"Status: {response.status_code}, Names: {names}")
+        
+        for test_id in test_ids:
+            self.make_request("DELETE", f"/tests/{test_id}", headers=headers)
+        
+        return True
+
+    def test_search_suggestions(self):
+        """Test autocomplete suggestions as a name is typed, misspelt and removed"""
+        print("\n=== Testing Search Suggestions ===")
+        
+        if not self.admin_token:
+            self.log_result("Search Suggestions", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        word = f"suggestcheck{int(time.time())}"
+        response = self.make_request("POST", "/tests", {
+            "name": f"{word} Hémoglobine", "description": "Anaemia screening", "category": "Hematology"
+        }, headers)
+        if response.status_code not in [200, 201]:
+            self.log_result("Suggestion Setup", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        test_id = response.json()["id"]
+        
+        def suggested_ids(query, **params):
+            response = self.make_request("GET", "/search/suggest", {"query": query, **params})
+            return [suggestion["id"] for suggestion in response.json()] if response.status_code == 200 else None
+        
+        # Prefixes of a word still being typed, with the accent left off
+        if all(test_id in (suggested_ids(query) or []) for query in [word[:8], f"{word} h", f"{word} hemo"]):
+            self.log_result("Prefix Suggestions", True, "Test suggested while its name is typed")
+        else:
+            self.log_result("Prefix Suggestions", False, f"{word} hemo -> {suggested_ids(f'{word} hemo')}")
+        
+        if test_id in (suggested_ids(f"l'hémoglobine {word}", language="fr") or []):
+            self.log_result("French Suggestions", True, "Elided article ignored")
+        else:
+            self.log_result("French Suggestions", False, "Test not suggested for a French query")
+        
+        if test_id in (suggested_ids(word[:-1] + "x") or []):
+            self.log_result("Misspelt Suggestions", True, "Test suggested despite a typo")
+        else:
+            self.log_result("Misspelt Suggestions", False, "Test not suggested for a misspelt query")
+        
+        if len(suggested_ids("a", limit=3) or []) <= 3 and self.make_request("GET", "/search/suggest", {"query": "a", "limit": 26}).status_code == 422:
+            self.log_result("Suggestion Limit", True, "Limit honoured and capped at 25")
+        else:
+            self.log_result("Suggestion Limit", False, "Suggestion limit not enforced")
+        
+        self.make_request("DELETE", f"/tests/{test_id}", headers=headers)
+        if test_id not in (suggested_ids(word) or [test_id]):
+            self.log_result("Removed Test Not Suggested", True, "Deleted test dropped from suggestions")
+        else:
+            self.log_result("Removed Test Not Suggested", False, "Deleted test still suggested")
+        
+        return True
+
+    def test_provider_options_order(self):
+        """Test provider options come cheapest first in the requested currency"""
+        print("\n=== Testing Provider Options Order ===")
+        
+        if not self.admin_token:
+            self.log_result("Provider Options Order", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        response = self.make_request("POST", "/tests", {
+            "name": "Provider Order Check Test", "description": "Provider ordering check", "category": "Hematology"
+        }, headers)
+        if response.status_code not in [200, 201]:
+            self.log_result("Provider Order Setup", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        test_id = response.json()["id"]
+        
+        # Cheaper in USD but with a dearer LRD override, and the other way round
+        clinic_ids = []
+        for name, price_usd, price_lrd in [("Cheaper USD Clinic", 10.00, 5000.00), ("Cheaper LRD Clinic", 20.00, 3000.00)]:
+            response = self.make_request("POST", "/clinics", {
+                "name": name,
+                "description": "Provider ordering check",
+                "location": "Sinkor, Monrovia",
+                "phone": "+231-777-112233",
+                "email": "order-check@healthcenter.lr",
+                "user_id": "order-check-user"
+            }, headers)
+            if response.status_code not in [200, 201]:
+                self.log_result("Provider Order Setup", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            clinic_ids.append(response.json()["id"])
+            self.make_request("POST", "/test-pricing", {
+                "test_id": test_id, "clinic_id": clinic_ids[-1],
+                "price_usd": price_usd, "price_lrd": price_lrd, "is_available": True
+            }, headers)
+        
+        for currency, expected in [("USD", clinic_ids), ("LRD", clinic_ids[::-1])]:
+            response = self.make_request("GET", f"/public/tests/{test_id}/provider-options", {"currency": currency})
+            order = [option["clinic_id"] for option in response.json()["providers"]] if response.status_code == 200 else None
+            if order == expected:
+                self.log_result(f"Provider Order In {currency}", True, "Cheapest provider listed first")
+            else:
+                self.log_result(f"Provider Order In {currency}", False, f"Expected {expected}, got {order}")
+        
+        for clinic_id in clinic_ids:
+            self.make_request("DELETE", f"/clinics/{clinic_id}", headers=headers)
+        self.make_request("DELETE", f"/tests/{test_id}", headers=headers)
+        
+        return True
+
+    def test_exchange_rate_pricing(self):
+        """Test LRD prices derived from the exchange rate, repricing overrides and clearing derivable ones"""
+        print("\n=== Testing Exchange Rate Pricing ===")
+        
+        if not self.admin_token or not self.test_data.get("clinic_id"):
+            self.log_result("Exchange Rate Pricing", False, "Missing admin token or clinic data")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        clinic_id = self.test_data["clinic_id"]
+        response = self.make_request("GET", "/exchange-rates/current")
+        if response.status_code != 200:
+            self.log_result("Current Exchange Rate", False, f"Status: {response.status_code}, Response: {response.text}")
+            return False
+        rate = response.json()["rate"]
+        
+        # No LRD price, an unrelated LRD override, and an override that is just the USD price converted
+        prices = {"derived": (10.00, None), "override": (10.00, 1234.00), "converted": (20.00, round(20.00 * rate, 2))}
+        test_ids = {}
+        for label, (price_usd, price_lrd) in prices.items():
+            response = self.make_request("POST", "/tests", {
+                "name": f"Exchange Rate Check {label.title()}", "description": "Exchange rate check", "category": "Hematology"
+            }, headers)
+            if response.status_code not in [200, 201]:
+                self.log_result("Exchange Rate Setup", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            test_ids[label] = response.json()["id"]
+            self.make_request("POST", "/test-pricing", {
+                "test_id": test_ids[label], "clinic_id": clinic_id,
+                "price_usd": price_usd, "price_lrd": price_lrd, "is_available": True
+            }, headers)
+        
+        def lrd_price(label):
+            response = self.make_request("GET", f"/public/tests/{test_ids[label]}/pricing/{clinic_id}")
+            return response.json()["price_lrd"] if response.status_code == 200 else None
+        
+        if lrd_price("derived") == round(10.00 * rate, 2):
+            self.log_result("Derived LRD Price", True, f"10 USD shown as {lrd_price('derived')} LRD at {rate}")
+        else:
+            self.log_result("Derived LRD Price", False, f"Expected {round(10.00 * rate, 2)}, got {lrd_price('derived')}")
+        
+        # Doubling and later halving the rate scales every override losslessly and back again
+        try:
+            response = self.make_request("POST", "/exchange-rates", {"rate": rate * 2, "reprice_overrides": True}, headers)
+            if (response.status_code == 200 and response.json()["repriced_overrides"] >= 2
+                    and lrd_price("derived") == round(20.00 * rate, 2) and lrd_price("override") == 2468.00):
+                self.log_result("Reprice Overrides", True, f"{response.json()['repriced_overrides']} overrides scaled with the rate")
+            else:
+                self.log_result("Reprice Overrides", False, f"Status: {response.status_code}, Response: {response.text}")
+            
+            # Clearing only drops overrides equal to the derived price, so no served price changes
+            response = self.make_request("POST", "/test-pricing/lrd-overrides/clear", {}, headers)
+            stored = {
+                row["test_id"]: row["price_lrd"]
+                for row in map(json.loads, self.make_request("GET", "/test-pricing/export", {"format": "ndjson"}, headers).text.splitlines())
+                if row["test_id"] in test_ids.values()
+            }
+            if (response.status_code == 200 and stored.get(test_ids["converted"], 0) is None
+                    and stored.get(test_ids["override"]) is not None):
+                self.log_result("Clear Derivable Overrides", True, f"{response.json()['cleared_overrides']} overrides cleared")
+            else:
+                self.log_result("Clear Derivable Overrides", False, f"Status: {response.status_code}, Stored LRD prices: {stored}")
+        finally:
+            self.make_request("POST", "/exchange-rates", {"rate": rate, "reprice_overrides": True}, headers)
+        
+        if lrd_price("converted") == round(20.00 * rate, 2) and lrd_price("override") == 1234.00:
+            self.log_result("Prices After Rate Restored", True, "Cleared row follows the rate, override scaled back")
+        else:
+            self.log_result("Prices After Rate Restored", False, f"Converted: {lrd_price('converted')}, override: {lrd_price('override')}")
+        
+        for test_id in test_ids.values():
+            self.make_request("DELETE", f"/tests/{test_id}", headers=headers)
+        
+        return True
+
     def run_all_tests(self):
         """Run all backend tests"""
         print("🏥 ChekUp Backend Comprehensive Testing")
@@ -1588,6 +2328,7 @@ class ChekUpTester:
             
             # NEW ADMIN MANAGEMENT FEATURES TESTING
             self.test_admin_user_management()  # NEW: Test admin user management endpoints
+            self.test_token_revocation()
             self.test_admin_surgery_inquiry_management()  # NEW: Test admin surgery inquiry management
             self.test_role_based_access_for_new_endpoints()  # NEW: Test role-based access for new endpoints
             self.test_data_validation_for_new_endpoints()  # NEW: Test data validation for new endpoints
@@ -1597,12 +2338,27 @@ class ChekUpTester:
             self.test_provider_communication_simulation()  # NEW: Test provider communication access
             self.test_end_to_end_workflow_integration()  # NEW: Test complete end-to-end workflow
             
+            # BOOKING WORKFLOW TESTING
+            self.test_result_file_download()
+            self.test_booking_pagination()
+            self.test_booking_status_transitions()
+            self.test_bulk_booking_update()
+            self.test_batch_cart_checkout()
+            self.test_pricing_import_export()
+            self.test_catalog_etag()
+            self.test_provider_options_order()
+            self.test_exchange_rate_pricing()
+            
             self.test_analytics_system()
+            self.test_analytics_timeseries()
             self.test_search_functionality()
+            self.test_search_ranking()
+            self.test_search_suggestions()
             self.test_public_endpoints()
             self.test_role_based_access_control()
             self.test_sub_admin_access_restrictions()  # Test sub-admin restrictions
             self.test_existing_functionality_integrity()  # Test existing functionality
+            self.test_auth_rate_limiting()  # Last: exhausts this client's login budget
             
         except Exception as e:
             print(f"\n❌ CRITICAL ERROR: {str(e)}")
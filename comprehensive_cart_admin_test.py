@@ -368,7 +368,7 @@ class ComprehensiveCartAdminTester:
         
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             self.log_result("Admin View All Bookings", True, f"Admin can view {len(bookings)} bookings")
             
             # Test booking status update (admin coordination)
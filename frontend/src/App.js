@@ -36,6 +36,22 @@ import {
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Bookings are paginated server-side; the first page also carries per-status totals
+const fetchBookingsPage = async (cursor = null) => {
+  const response = await axios.get(`${API}/bookings`, { params: cursor ? { cursor } : {} });
+  return response.data;
+};
+
+// Per-status totals for one clinic, without fetching its bookings
+const fetchClinicStatusCounts = async (clinicId) => {
+  const response = await axios.get(`${API}/bookings`, { params: { clinic_id: clinicId, limit: 1 } });
+  return response.data.status_counts || {};
+};
+
+const countBookings = (statusCounts, ...statuses) =>
+  (statuses.length ? statuses : Object.keys(statusCounts))
+    .reduce((total, status) => total + (statusCounts[status] || 0), 0);
+
 // Auth Context
 const AuthContext = createContext();
 
@@ -281,7 +297,8 @@ const Home = () => {
   const handleClinicSelect = async (clinic) => {
     try {
       const response = await axios.get(`${API}/public/clinics/${clinic.id}/tests`);
-      setTestPricing(response.data);
+      // The clinic is sent once; attach it to each row to match the test pricing shape
+      setTestPricing(response.data.tests.map(item => ({ ...item, clinic: response.data.clinic })));
       setSelectedClinic(clinic);
       setSelectedTests([]);
     } catch (error) {
@@ -832,6 +849,8 @@ const Login = () => {
 const SubAdminDashboard = () => {
   const { user } = useAuth();
   const [bookings, setBookings] = useState([]);
+  const [bookingsCursor, setBookingsCursor] = useState(null);
+  const [bookingStats, setBookingStats] = useState({});
   const [clinics, setClinics] = useState([]);
 
   useEffect(() => {
@@ -843,8 +862,20 @@ const SubAdminDashboard = () => {
 
   const fetchBookings = async () => {
     try {
-      const response = await axios.get(`${API}/bookings`);
-      setBookings(response.data);
+      const page = await fetchBookingsPage();
+      setBookings(page.bookings);
+      setBookingsCursor(page.next_cursor);
+      setBookingStats(page.status_counts || {});
+    } catch (error) {
+      console.error('Error fetching bookings:', error);
+    }
+  };
+
+  const loadMoreBookings = async () => {
+    try {
+      const page = await fetchBookingsPage(bookingsCursor);
+      setBookings(prev => [...prev, ...page.bookings]);
+      setBookingsCursor(page.next_cursor);
     } catch (error) {
       console.error('Error fetching bookings:', error);
     }
@@ -907,7 +938,7 @@ const SubAdminDashboard = () => {
               <div className="min-w-0">
                 <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">New Bookings</p>
                 <p className="text-lg sm:text-2xl font-bold text-gray-900">
-                  {bookings.filter(b => b.status === 'pending').length}
+                  {countBookings(bookingStats, 'pending')}
                 </p>
               </div>
             </div>
@@ -919,7 +950,7 @@ const SubAdminDashboard = () => {
               <div className="min-w-0">
                 <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">In Progress</p>
                 <p className="text-lg sm:text-2xl font-bold text-gray-900">
-                  {bookings.filter(b => ['confirmed', 'sample_collected'].includes(b.status)).length}
+                  {countBookings(bookingStats, 'confirmed', 'sample_collected')}
                 </p>
               </div>
             </div>
@@ -931,7 +962,7 @@ const SubAdminDashboard = () => {
               <div className="min-w-0">
                 <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">Results Ready</p>
                 <p className="text-lg sm:text-2xl font-bold text-gray-900">
-                  {bookings.filter(b => b.status === 'results_ready').length}
+                  {countBookings(bookingStats, 'results_ready')}
                 </p>
               </div>
             </div>
@@ -943,7 +974,7 @@ const SubAdminDashboard = () => {
               <div className="min-w-0">
                 <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">Completed</p>
                 <p className="text-lg sm:text-2xl font-bold text-gray-900">
-                  {bookings.filter(b => b.status === 'completed').length}
+                  {countBookings(bookingStats, 'completed')}
                 </p>
               </div>
             </div>
@@ -1059,6 +1090,17 @@ const SubAdminDashboard = () => {
               </tbody>
             </table>
 
+            {bookingsCursor && (
+              <div className="text-center py-4">
+                <button
+                  onClick={loadMoreBookings}
+                  className="text-blue-600 hover:text-blue-800 text-sm px-4 py-2 border border-blue-300 rounded"
+                >
+                  Load more bookings
+                </button>
+              </div>
+            )}
+
             {bookings.length === 0 && (
               <div className="text-center py-12">
                 <Calendar className="mx-auto h-12 w-12 text-gray-400" />
@@ -1308,6 +1350,9 @@ const AdminDashboard = () => {
   const [tests, setTests] = useState([]);
   const [clinics, setClinics] = useState([]);
   const [bookings, setBookings] = useState([]);
+  const [bookingsCursor, setBookingsCursor] = useState(null);
+  const [bookingStats, setBookingStats] = useState({});
+  const [providerStats, setProviderStats] = useState({});
   const [subAdmins, setSubAdmins] = useState([]);
   const [surgeryInquiries, setSurgeryInquiries] = useState([]);
   
@@ -1325,6 +1370,10 @@ const AdminDashboard = () => {
     fetchSurgeryInquiries();
   }, [user]);
 
+  useEffect(() => {
+    if (activeTab === 'communication') fetchProviderStats();
+  }, [activeTab]);
+
   const fetchTests = async () => {
     try {
       const response = await axios.get(`${API}/tests`);
@@ -1345,13 +1394,35 @@ const AdminDashboard = () => {
 
   const fetchBookings = async () => {
     try {
-      const response = await axios.get(`${API}/bookings`);
-      setBookings(response.data);
+      const page = await fetchBookingsPage();
+      setBookings(page.bookings);
+      setBookingsCursor(page.next_cursor);
+      setBookingStats(page.status_counts || {});
+    } catch (error) {
+      console.error('Error fetching bookings:', error);
+    }
+  };
+
+  const loadMoreBookings = async () => {
+    try {
+      const page = await fetchBookingsPage(bookingsCursor);
+      setBookings(prev => [...prev, ...page.bookings]);
+      setBookingsCursor(page.next_cursor);
     } catch (error) {
       console.error('Error fetching bookings:', error);
     }
   };
 
+  const fetchProviderStats = async () => {
+    try {
+      // Every clinic's totals in one request, keyed by clinic id
+      const response = await axios.get(`${API}/bookings/status-counts`);
+      setProviderStats(response.data);
+    } catch (error) {
+      console.error('Error fetching provider booking counts:', error);
+    }
+  };
+
   const fetchSubAdmins = async () => {
     try {
       // Get all users with sub_admin role
@@ -1425,15 +1496,15 @@ const AdminDashboard = () => {
 
   const handleSendBookingsToProvider = async (providerId) => {
     try {
-      // Get bookings assigned to this provider
-      const providerBookings = bookings.filter(b => b.clinic_id === providerId);
-      if (providerBookings.length === 0) {
+      // Count bookings assigned to this provider
+      const providerBookingCount = countBookings(await fetchClinicStatusCounts(providerId));
+      if (providerBookingCount === 0) {
         alert('No bookings assigned to this provider');
         return;
       }
       
       // In a real implementation, this would send notifications via email/SMS
-      alert(`${providerBookings.length} booking(s) sent to provider successfully!`);
+      alert(`${providerBookingCount} booking(s) sent to provider successfully!`);
     } catch (error) {
       console.error('Error sending bookings:', error);
       alert('Error sending bookings to provider');
@@ -1496,7 +1567,16 @@ const AdminDashboard = () => {
     }
   };
 
-  const handleViewMedicalReport = (medicalReport) => {
+  const handleViewMedicalReport = async (inquiryId) => {
+    // The inquiry list only carries report metadata, so fetch the file itself on demand
+    let medicalReport = null;
+    try {
+      const response = await axios.get(`${API}/surgery-inquiries/${inquiryId}/medical-report`);
+      medicalReport = response.data;
+    } catch (error) {
+      console.error('Error fetching medical report:', error);
+    }
+
     if (!medicalReport || !medicalReport.data) {
       alert('No medical report available for this surgery inquiry.');
       return;
@@ -1712,7 +1792,7 @@ const AdminDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-yellow-800 truncate">Pending Bookings</p>
               <p className="text-lg sm:text-2xl font-bold text-yellow-900">
-                {bookings.filter(b => b.status === 'pending').length}
+                {countBookings(bookingStats, 'pending')}
               </p>
             </div>
           </div>
@@ -1724,7 +1804,7 @@ const AdminDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-purple-800 truncate">Results Pending</p>
               <p className="text-lg sm:text-2xl font-bold text-purple-900">
-                {bookings.filter(b => b.status === 'sample_collected').length}
+                {countBookings(bookingStats, 'sample_collected')}
               </p>
             </div>
           </div>
@@ -1751,9 +1831,9 @@ const AdminDashboard = () => {
             </thead>
             <tbody className="divide-y divide-gray-200">
               {clinics.map(clinic => {
-                const clinicBookings = bookings.filter(b => b.clinic_id === clinic.id);
-                const pendingBookings = clinicBookings.filter(b => b.status === 'pending' || b.status === 'confirmed');
-                const completedBookings = clinicBookings.filter(b => b.status === 'completed');
+                const clinicStats = providerStats[clinic.id] || {};
+                const pendingBookings = countBookings(clinicStats, 'pending', 'confirmed');
+                const completedBookings = countBookings(clinicStats, 'completed');
                 
                 return (
                   <tr key={clinic.id}>
@@ -1783,8 +1863,8 @@ const AdminDashboard = () => {
                     </td>
                     <td className="px-3 sm:px-6 py-4">
                       <div className="text-sm space-y-1">
-                        <div className="text-blue-600">{pendingBookings.length} pending bookings</div>
-                        <div className="text-green-600">{completedBookings.length} completed</div>
+                        <div className="text-blue-600">{pendingBookings} pending bookings</div>
+                        <div className="text-green-600">{completedBookings} completed</div>
                         <div className="text-xs text-gray-500">
                           Last activity: Recently
                         </div>
@@ -2002,7 +2082,7 @@ const AdminDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-yellow-800 truncate">New Bookings</p>
               <p className="text-lg sm:text-2xl font-bold text-yellow-900">
-                {bookings.filter(b => b.status === 'pending').length}
+                {countBookings(bookingStats, 'pending')}
               </p>
             </div>
           </div>
@@ -2014,7 +2094,7 @@ const AdminDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-blue-800 truncate">Scheduled</p>
               <p className="text-lg sm:text-2xl font-bold text-blue-900">
-                {bookings.filter(b => b.status === 'confirmed').length}
+                {countBookings(bookingStats, 'confirmed')}
               </p>
             </div>
           </div>
@@ -2026,7 +2106,7 @@ const AdminDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-orange-800 truncate">In Progress</p>
               <p className="text-lg sm:text-2xl font-bold text-orange-900">
-                {bookings.filter(b => b.status === 'sample_collected' || b.status === 'results_ready').length}
+                {countBookings(bookingStats, 'sample_collected', 'results_ready')}
               </p>
             </div>
           </div>
@@ -2038,7 +2118,7 @@ const AdminDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-green-800 truncate">Completed</p>
               <p className="text-lg sm:text-2xl font-bold text-green-900">
-                {bookings.filter(b => b.status === 'completed').length}
+                {countBookings(bookingStats, 'completed')}
               </p>
             </div>
           </div>
@@ -2178,6 +2258,17 @@ const AdminDashboard = () => {
           </tbody>
         </table>
         
+        {bookingsCursor && (
+          <div className="text-center py-4">
+            <button
+              onClick={loadMoreBookings}
+              className="text-blue-600 hover:text-blue-800 text-sm px-4 py-2 border border-blue-300 rounded"
+            >
+              Load more bookings
+            </button>
+          </div>
+        )}
+
         {bookings.length === 0 && (
           <div className="text-center py-12">
             <p className="text-gray-500">No bookings found.</p>
@@ -2727,7 +2818,7 @@ const AdminDashboard = () => {
                       {inquiry.medical_report && (
                         <button 
                           className="text-green-600 hover:text-green-800 text-xs px-2 py-1 border border-green-300 rounded"
-                          onClick={() => handleViewMedicalReport(inquiry.medical_report)}
+                          onClick={() => handleViewMedicalReport(inquiry.id)}
                         >
                           View Report
                         </button>
@@ -3280,7 +3371,8 @@ const PricingForm = ({ tests, clinics, onSuccess }) => {
       await axios.post(`${API}/test-pricing`, {
         ...formData,
         price_usd: parseFloat(formData.price_usd),
-        price_lrd: parseFloat(formData.price_lrd)
+        // Left blank, the LRD price follows the current exchange rate
+        price_lrd: formData.price_lrd === '' ? null : parseFloat(formData.price_lrd)
       });
       setShow(false);
       setFormData({
@@ -3367,7 +3459,7 @@ const PricingForm = ({ tests, clinics, onSuccess }) => {
             <input
               type="number"
               step="0.01"
-              required
+              placeholder="From exchange rate"
               className="w-full border rounded px-3 py-2"
               value={formData.price_lrd}
               onChange={(e) => setFormData({...formData, price_lrd: e.target.value})}
@@ -4669,6 +4761,8 @@ const ClinicDashboard = () => {
   const { user } = useAuth();
   const [activeTab, setActiveTab] = useState('dashboard');
   const [bookings, setBookings] = useState([]);
+  const [bookingsCursor, setBookingsCursor] = useState(null);
+  const [bookingStats, setBookingStats] = useState({});
   const [myClinic, setMyClinic] = useState(null);
   const [testPricing, setTestPricing] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -4694,8 +4788,20 @@ const ClinicDashboard = () => {
 
   const fetchBookings = async () => {
     try {
-      const response = await axios.get(`${API}/bookings`);
-      setBookings(response.data);
+      const page = await fetchBookingsPage();
+      setBookings(page.bookings);
+      setBookingsCursor(page.next_cursor);
+      setBookingStats(page.status_counts || {});
+    } catch (error) {
+      console.error('Error fetching bookings:', error);
+    }
+  };
+
+  const loadMoreBookings = async () => {
+    try {
+      const page = await fetchBookingsPage(bookingsCursor);
+      setBookings(prev => [...prev, ...page.bookings]);
+      setBookingsCursor(page.next_cursor);
     } catch (error) {
       console.error('Error fetching bookings:', error);
     }
@@ -4705,7 +4811,7 @@ const ClinicDashboard = () => {
     try {
       if (myClinic) {
         const response = await axios.get(`${API}/public/clinics/${myClinic.id}/tests`);
-        setTestPricing(response.data);
+        setTestPricing(response.data.tests);
       }
     } catch (error) {
       console.error('Error fetching test pricing:', error);
@@ -4776,7 +4882,7 @@ const ClinicDashboard = () => {
             <Calendar className="h-6 w-6 sm:h-8 sm:w-8 text-blue-600 mr-3 flex-shrink-0" />
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">Total Bookings</p>
-              <p className="text-lg sm:text-2xl font-bold text-gray-900">{bookings.length}</p>
+              <p className="text-lg sm:text-2xl font-bold text-gray-900">{countBookings(bookingStats)}</p>
             </div>
           </div>
         </div>
@@ -4787,7 +4893,7 @@ const ClinicDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">Completed</p>
               <p className="text-lg sm:text-2xl font-bold text-gray-900">
-                {bookings.filter(b => b.status === 'completed').length}
+                {countBookings(bookingStats, 'completed')}
               </p>
             </div>
           </div>
@@ -4799,7 +4905,7 @@ const ClinicDashboard = () => {
             <div className="min-w-0">
               <p className="text-xs sm:text-sm font-medium text-gray-600 truncate">Pending</p>
               <p className="text-lg sm:text-2xl font-bold text-gray-900">
-                {bookings.filter(b => b.status === 'pending').length}
+                {countBookings(bookingStats, 'pending')}
               </p>
             </div>
           </div>
@@ -4883,6 +4989,17 @@ const ClinicDashboard = () => {
           </tbody>
         </table>
         
+        {bookingsCursor && (
+          <div className="text-center py-4">
+            <button
+              onClick={loadMoreBookings}
+              className="text-blue-600 hover:text-blue-800 text-sm px-4 py-2 border border-blue-300 rounded"
+            >
+              Load more bookings
+            </button>
+          </div>
+        )}
+
         {bookings.length === 0 && (
           <div className="text-center py-12">
             <p className="text-gray-500">No bookings assigned to your clinic yet.</p>
@@ -5512,9 +5629,12 @@ const TestProviders = () => {
 
   useEffect(() => {
     fetchTestDetails();
-    fetchTestProviders();
   }, [testId]);
 
+  useEffect(() => {
+    fetchTestProviders();
+  }, [testId, currency]);
+
   const fetchTestDetails = async () => {
     try {
       const response = await axios.get(`${API}/public/tests/${testId}`);
@@ -5526,8 +5646,9 @@ const TestProviders = () => {
 
   const fetchTestProviders = async () => {
     try {
-      const response = await axios.get(`${API}/public/tests/${testId}/providers`);
-      setProviders(response.data);
+      // Providers come back cheapest first in the chosen currency, each carrying its price for this test
+      const response = await axios.get(`${API}/public/tests/${testId}/provider-options`, { params: { currency } });
+      setProviders(response.data.providers.map(option => ({ ...option, id: option.clinic_id })));
       setLoading(false);
     } catch (error) {
       console.error('Error fetching test providers:', error);
@@ -5535,14 +5656,15 @@ const TestProviders = () => {
     }
   };
 
-  const handleProviderSelect = async (provider) => {
-    try {
-      const response = await axios.get(`${API}/public/tests/${testId}/pricing/${provider.id}`);
-      setPricing(response.data);
-      setSelectedProvider(provider);
-    } catch (error) {
-      console.error('Error fetching pricing:', error);
-    }
+  const handleProviderSelect = (provider) => {
+    setPricing({
+      id: provider.pricing_id,
+      test_id: testId,
+      clinic_id: provider.clinic_id,
+      price_usd: provider.price_usd,
+      price_lrd: provider.price_lrd
+    });
+    setSelectedProvider(provider);
   };
 
   const handleAddToCart = () => {
@@ -5737,28 +5859,18 @@ const CartBookingForm = ({ cartItems, currency, total, onClose, onSuccess }) =>
     setLoading(true);
 
     try {
-      // Create individual bookings for each cart item
-      const bookingPromises = cartItems.map(async (item) => {
-        const bookingData = {
-          patient_name: formData.patient_name,
-          patient_phone: formData.patient_phone,
-          patient_location: formData.patient_location,
-          test_ids: [item.test.id],
-          clinic_id: item.provider.id,
-          preferred_currency: currency.toUpperCase(),
-          total_amount: currency === 'USD' ? item.pricing.price_usd : item.pricing.price_lrd,
-          delivery_method: formData.delivery_method,
-          preferred_date: formData.preferred_date,
-          preferred_time: formData.preferred_time,
-          notes: `Booked via cart - Test: ${item.test.name}, Provider: ${item.provider.name} | Preferred Date: ${formData.preferred_date} | Preferred Time: ${formData.preferred_time}`
-        };
-
-        return axios.post(`${API}/bookings`, bookingData);
+      // Check out the whole cart in one request; the server creates one booking per provider
+      const response = await axios.post(`${API}/bookings/batch`, {
+        patient_name: formData.patient_name,
+        patient_phone: formData.patient_phone,
+        patient_location: formData.patient_location,
+        preferred_currency: currency.toUpperCase(),
+        delivery_method: formData.delivery_method,
+        notes: `Booked via cart - Tests: ${cartItems.map(item => `${item.test.name} (${item.provider.name})`).join(', ')} | Preferred Date: ${formData.preferred_date} | Preferred Time: ${formData.preferred_time}`,
+        items: cartItems.map(item => ({ test_id: item.test.id, clinic_id: item.provider.id }))
       });
-
-      await Promise.all(bookingPromises);
       
-      alert(`Successfully booked ${cartItems.length} test(s)!\n\nBooking Details:\n- Total Amount: ${currency === 'USD' ? '$' : 'L$'}${total}\n- Tests: ${cartItems.map(item => item.test.name).join(', ')}\n\nYou will be contacted shortly for sample collection.`);
+      alert(`Successfully booked ${cartItems.length} test(s)!\n\nBooking Details:\n- Total Amount: ${currency === 'USD' ? '$' : 'L$'}${total}\n- Tests: ${cartItems.map(item => item.test.name).join(', ')}\n- Booking Numbers: ${response.data.booking_numbers.join(', ')}\n\nYou will be contacted shortly for sample collection.`);
       
       onSuccess();
     } catch (error) {
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test Pricing Lookup Benchmark for ChekUp Platform
+Compares the per-clinic find_one loop previously used by GET /api/tests/{test_id}/pricing
+with the single $lookup aggregation, as the number of providers offering a test grows.
+Needs a reachable MongoDB (MONGO_URL); seeds and then drops a scratch database.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Configuration
+BENCHMARK_DB = "chekup_pricing_benchmark"
+PROVIDER_COUNTS = [10, 50, 200, 500]
+REPEATS = 20
+
+os.environ["DB_NAME"] = BENCHMARK_DB
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import server  # noqa: E402
+
+db = server.db
+
+async def legacy_pricing_lookup(test_id: str):
+    """The original N+1 implementation: one clinics.find_one per pricing row"""
+    test = await db.tests.find_one({"id": test_id})
+    pricing = await db.test_pricing.find({"test_id": test_id, "is_available": True}).to_list(1000)
+
+    result = []
+    for price in pricing:
+        clinic = await db.clinics.find_one({"id": price["clinic_id"]})
+        if clinic:
+            result.append({
+                "test": server.Test(**test),
+                "clinic": server.Clinic(**clinic),
+                "pricing": server.TestPricing(**price)
+            })
+    return result
+
+async def seed_test(provider_count: int) -> str:
+    """Create one test offered by provider_count clinics"""
+    test = server.Test(
+        name=f"Benchmark Test ({provider_count} providers)",
+        description="Seeded by pricing_lookup_benchmark.py",
+        category="Benchmark"
+    )
+    await db.tests.insert_one(test.dict())
+
+    clinics = [
+        server.Clinic(
+            name=f"Benchmark Clinic {i}",
+            description="Seeded by pricing_lookup_benchmark.py",
+            location="Monrovia, Liberia",
+            phone="+231-000-000000",
+            email=f"clinic{i}-{uuid.uuid4().hex[:6]}@benchmark.chekup.com",
+            user_id=str(uuid.uuid4())
+        )
+        for i in range(provider_count)
+    ]
+    await db.clinics.insert_many([clinic.dict() for clinic in clinics])
+    await db.test_pricing.insert_many([
+        server.TestPricing(test_id=test.id, clinic_id=clinic.id, price_usd=25.0, price_lrd=4750.0).dict()
+        for clinic in clinics
+    ])
+    return test.id
+
+async def median_latency_ms(lookup, test_id: str) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await lookup(test_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+async def main():
+    print("📊 Test Pricing Lookup Benchmark")
+    print("=" * 50)
+    print(f"{'providers':>10} {'N+1 (ms)':>12} {'$lookup (ms)':>14}")
+
+    await server.client.drop_database(BENCHMARK_DB)
+    try:
+        await server.ensure_indexes()
+        for provider_count in PROVIDER_COUNTS:
+            test_id = await seed_test(provider_count)
+            legacy_ms = await median_latency_ms(legacy_pricing_lookup, test_id)
+            joined_ms = await median_latency_ms(server.get_test_pricing_by_test, test_id)
+            print(f"{provider_count:>10} {legacy_ms:>12.2f} {joined_ms:>14.2f}")
+    finally:
+        await server.client.drop_database(BENCHMARK_DB)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -187,7 +187,7 @@ class ProviderClinicLinkTester:
         # Step 9: Test provider can view their clinic's bookings
         response = self.make_request("GET", "/bookings", headers=provider_headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             print(f"✅ Provider can view {len(bookings)} bookings")
             
             # Check if our test booking is in the list
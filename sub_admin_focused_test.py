@@ -116,7 +116,7 @@ class SubAdminFocusedTester:
         # Get existing booking
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             if bookings:
                 self.test_data["booking_id"] = bookings[0]["id"]
                 print(f"✅ Using existing booking: {bookings[0]['booking_number']}")
@@ -185,7 +185,7 @@ class SubAdminFocusedTester:
         # Test 1: Sub-admin can view all bookings (like admin)
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             self.log_result("View All Bookings (Admin-level Access)", True, 
                           f"Sub-admin can view all {len(bookings)} bookings in system")
         else:
@@ -351,7 +351,7 @@ class SubAdminFocusedTester:
             
             response = self.make_request("GET", "/bookings", headers=headers)
             if response.status_code == 200:
-                bookings = response.json()
+                bookings = response.json()["bookings"]
                 self.log_result("Clinic Booking Access ✅", True, 
                               f"Clinic can access their {len(bookings)} bookings")
             else:
@@ -151,7 +151,7 @@ class SubAdminTester:
         # Test read access to bookings
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             self.log_result("Sub-Admin View Bookings", True, f"Sub-Admin can view {len(bookings)} bookings")
         else:
             self.log_result("Sub-Admin View Bookings", False, f"Status: {response.status_code}")
@@ -160,7 +160,7 @@ class SubAdminTester:
         # This would require a specific endpoint for assignment
         response = self.make_request("GET", "/bookings", headers=headers)
         if response.status_code == 200:
-            bookings = response.json()
+            bookings = response.json()["bookings"]
             if bookings:
                 booking_id = bookings[0]["id"]
                 # Test status update (limited coordination tasks)
@@ -264,7 +264,7 @@ class SubAdminTester:
                 headers = {"Authorization": f"Bearer {lab_tech_token}"}
                 response = self.make_request("GET", "/bookings", headers=headers)
                 if response.status_code == 200:
-                    bookings = response.json()
+                    bookings = response.json()["bookings"]
                     self.log_result("Lab Technician View Bookings", True, f"Lab Technician can view {len(bookings)} bookings")
                 else:
                     self.log_result("Lab Technician View Bookings", False, f"Status: {response.status_code}")
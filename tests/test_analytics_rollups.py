@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from server import booking_rollup_update, booking_test_revenue
+
+
+def booking(**fields):
+    return {
+        "clinic_id": "c1", "preferred_currency": "LRD", "test_ids": ["t1", "t2"],
+        "total_amount": 130.0, "delivery_charge": 10.0, **fields
+    }
+
+
+def test_test_revenue_uses_price_snapshot():
+    assert booking_test_revenue(booking(test_prices={"t1": 100.0, "t2": 20.0})) == [("t1", 100.0), ("t2", 20.0)]
+
+
+def test_test_revenue_splits_total_without_snapshot():
+    assert booking_test_revenue(booking()) == [("t1", 60.0), ("t2", 60.0)]
+
+
+def test_creation_counts_booking_revenue_and_tests():
+    key, increments = booking_rollup_update(
+        booking(test_prices={"t1": 100.0, "t2": 20.0}), "pending", datetime(2026, 5, 2, 17, 45), True
+    )
+    assert key == {"date": datetime(2026, 5, 2), "clinic_id": "c1", "currency": "LRD"}
+    assert increments == {
+        "transitions.pending": 1, "bookings": 1, "revenue": 130.0,
+        "tests.t1.bookings": 1, "tests.t1.revenue": 100.0,
+        "tests.t2.bookings": 1, "tests.t2.revenue": 20.0
+    }
+
+
+def test_completion_only_moves_status_and_completed_revenue():
+    _, increments = booking_rollup_update(booking(), "completed", datetime(2026, 5, 3), False)
+    assert increments == {"transitions.completed": 1, "completed_revenue": 130.0}
@@ -0,0 +1,71 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+import server
+
+
+def make_booking(clinic_id: str = "clinic-1") -> server.Booking:
+    return server.Booking(
+        patient_name="Test Patient", patient_phone="+231-777-000000", patient_location="Monrovia",
+        test_ids=["test-1"], clinic_id=clinic_id, delivery_method="whatsapp"
+    )
+
+
+class FakeBookings:
+    """Fails the first insert with the given write errors, then accepts everything"""
+
+    def __init__(self, write_errors):
+        self.write_errors = write_errors
+        self.inserted = []
+        self.deleted = None
+
+    async def insert_many(self, documents, ordered):
+        assert ordered is False
+        if self.write_errors:
+            errors, self.write_errors = self.write_errors, None
+            failed = {error["index"] for error in errors}
+            self.inserted += [document for index, document in enumerate(documents) if index not in failed]
+            raise BulkWriteError({"writeErrors": errors})
+        self.inserted += documents
+
+    async def delete_many(self, query):
+        self.deleted = query["id"]["$in"]
+
+
+def insert(bookings, fake):
+    recorded = []
+
+    async def record(events):
+        recorded.extend(events)
+
+    with mock.patch.object(server, "db", mock.Mock(bookings=fake)), \
+            mock.patch.object(server, "record_booking_events", record):
+        asyncio.run(server.insert_bookings(bookings))
+    return recorded
+
+
+def test_booking_number_collisions_are_renumbered_and_retried():
+    bookings = [make_booking("clinic-1"), make_booking("clinic-2")]
+    collided_number = bookings[1].booking_number
+    fake = FakeBookings([{"index": 1, "code": 11000, "keyPattern": {"booking_number": 1}, "errmsg": "duplicate"}])
+
+    recorded = insert(bookings, fake)
+
+    assert bookings[1].booking_number != collided_number
+    assert [document["id"] for document in fake.inserted] == [booking.id for booking in bookings]
+    assert len(recorded) == 2
+
+
+def test_other_write_errors_remove_the_partial_cart():
+    bookings = [make_booking("clinic-1"), make_booking("clinic-2")]
+    fake = FakeBookings([{"index": 1, "code": 121, "errmsg": "Document failed validation"}])
+
+    with pytest.raises(HTTPException) as error:
+        insert(bookings, fake)
+
+    assert error.value.status_code == 500
+    assert fake.deleted == [booking.id for booking in bookings]
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from server import after_page_cursor, decode_page_cursor, encode_page_cursor
+
+
+def test_cursor_round_trips_created_at_and_id():
+    created_at = datetime(2026, 3, 14, 9, 26, 53, 589000)
+    cursor = encode_page_cursor({"created_at": created_at, "id": "b-42", "patient_name": "ignored"})
+    assert decode_page_cursor(cursor) == (created_at, "b-42")
+
+
+def test_after_page_cursor_breaks_created_at_ties_by_id():
+    created_at = datetime(2026, 3, 14, 9, 26, 53)
+    cursor = encode_page_cursor({"created_at": created_at, "id": "b-42"})
+    assert after_page_cursor({"status": "pending"}, None) == {"status": "pending"}
+    assert after_page_cursor({"status": "pending"}, cursor) == {"$and": [{"status": "pending"}, {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": "b-42"}}
+    ]}]}
+
+
+def test_malformed_cursor_is_400():
+    with pytest.raises(HTTPException) as error:
+        after_page_cursor({}, "not-a-cursor")
+    assert error.value.status_code == 400
@@ -0,0 +1,28 @@
+from server import BOOKING_STATUS_TRANSITIONS, BookingStatus, Principal, UserRole, booking_transition_filter
+
+ADMIN = Principal(id="admin", role=UserRole.ADMIN)
+CLINIC_USER = Principal(id="clinic-user", role=UserRole.CLINIC, clinic_id="clinic-1")
+
+
+def test_final_statuses_allow_no_transitions():
+    assert BOOKING_STATUS_TRANSITIONS[BookingStatus.COMPLETED] == []
+    assert BOOKING_STATUS_TRANSITIONS[BookingStatus.CANCELLED] == []
+
+
+def test_filter_matches_only_allowed_sources():
+    query = booking_transition_filter("b1", BookingStatus.PENDING, ADMIN)
+    assert query == {"id": "b1", "status": {"$in": []}}
+
+    query = booking_transition_filter("b1", BookingStatus.RESULTS_READY, ADMIN)
+    assert set(query["status"]["$in"]) == {"pending", "confirmed", "sample_collected"}
+
+
+def test_filter_can_allow_staying_in_the_same_status():
+    query = booking_transition_filter("b1", BookingStatus.RESULTS_READY, ADMIN, allow_same=True)
+    assert "results_ready" in query["status"]["$in"]
+    assert "completed" not in query["status"]["$in"]
+
+
+def test_clinic_users_are_limited_to_their_clinic():
+    assert "clinic_id" not in booking_transition_filter("b1", BookingStatus.CONFIRMED, ADMIN)
+    assert booking_transition_filter("b1", BookingStatus.CONFIRMED, CLINIC_USER)["clinic_id"] == "clinic-1"
@@ -0,0 +1,38 @@
+import asyncio
+
+from server import TTLCache, catalog_cache, catalog_response, etag_matches
+
+
+def test_etag_matching_accepts_lists_weak_tags_and_wildcard():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"old", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"old"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_catalog_response_answers_304_for_current_etag():
+    catalog_cache.invalidate()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return [{"id": "t1", "name": "Malaria Test"}]
+
+    first = asyncio.run(catalog_response("test-catalog", loader))
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = asyncio.run(catalog_response("test-catalog", loader, etag))
+    assert second.status_code == 304
+    assert second.body == b""
+    assert second.headers["etag"] == etag
+    assert len(loads) == 1
+
+
+def test_loads_started_before_an_invalidation_are_not_cached():
+    cache = TTLCache(60, 10)
+    generation = cache.generation
+    cache.invalidate("tests")
+    cache.set("tests", "stale", generation)
+    assert cache.get("tests") is None
@@ -0,0 +1,43 @@
+import asyncio
+from unittest import mock
+
+import server
+from server import ExchangeRateCreate, ExchangeRateHolder, LrdOverrideClear, Principal, with_lrd_price
+
+ADMIN = Principal(id="admin-1", role="admin")
+
+
+def test_missing_lrd_price_is_derived_from_the_rate():
+    assert with_lrd_price({"price_usd": 12.5, "price_lrd": None}, 190.0)["price_lrd"] == 2375.0
+    assert with_lrd_price({"price_usd": 12.5, "price_lrd": 2000.0}, 190.0)["price_lrd"] == 2000.0
+
+
+def test_reprice_scales_overrides_from_the_latest_stored_rate():
+    exchange_rates = mock.Mock(find_one=mock.AsyncMock(return_value={"rate": 150.0}), insert_one=mock.AsyncMock())
+    reprice = mock.AsyncMock(return_value=3)
+    # This worker's in-memory rate is stale; another worker recorded 150 since
+    with mock.patch.object(server, "db", mock.Mock(exchange_rates=exchange_rates)), \
+            mock.patch.object(server, "current_exchange_rate", ExchangeRateHolder(999.0)), \
+            mock.patch.object(server, "reprice_lrd_overrides", reprice), \
+            mock.patch.object(server, "refresh_test_providers", mock.AsyncMock()):
+        result = asyncio.run(server.set_exchange_rate(ExchangeRateCreate(rate=300.0, reprice_overrides=True), ADMIN))
+        assert server.current_exchange_rate.rate == 300.0
+    reprice.assert_awaited_once_with(2.0)
+    assert result["repriced_overrides"] == 3
+
+
+def test_clear_only_matches_overrides_within_tolerance_of_the_derived_price():
+    update_many = mock.AsyncMock(return_value=mock.Mock(modified_count=0))
+    with mock.patch.object(server, "db", mock.Mock(test_pricing=mock.Mock(update_many=update_many))):
+        result = asyncio.run(server.clear_derivable_lrd_overrides(LrdOverrideClear(rate=200.0, tolerance=0.01), ADMIN))
+    query, update = update_many.await_args.args
+    derived = {"$multiply": ["$price_usd", 200.0]}
+    assert query == {
+        "price_lrd": {"$ne": None},
+        "$expr": {"$lte": [
+            {"$abs": {"$subtract": ["$price_lrd", derived]}},
+            {"$max": [0.01, {"$multiply": [derived, 0.01]}]}
+        ]}
+    }
+    assert update["$set"]["price_lrd"] is None
+    assert result == {"cleared_overrides": 0, "rate": 200.0}
@@ -0,0 +1,45 @@
+import io
+import json
+
+from fastapi import UploadFile
+
+from server import PricingFileFormat, is_utf8_file, read_pricing_rows
+
+
+def upload(content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="pricing")
+
+
+def test_utf8_check_reads_whole_file_and_rewinds():
+    handle = io.BytesIO("test_id,clinic_id,price_usd\ntést,c,1\n".encode("utf-8") * 50000)
+    assert is_utf8_file(handle)
+    assert handle.tell() == 0
+
+    handle = io.BytesIO(b"test_id,clinic_id,price_usd\n" * 50000 + b"\xff,c,1\n")
+    assert not is_utf8_file(handle)
+    assert handle.tell() == 0
+
+
+def test_csv_rows_carry_line_numbers_and_drop_blank_cells():
+    rows = list(read_pricing_rows(
+        upload(b"\xef\xbb\xbftest_id,clinic_id,price_usd,price_lrd\nt1,c1,10,\nt2,c1,12,2400\n"),
+        PricingFileFormat.CSV
+    ))
+    assert rows == [
+        (2, {"test_id": "t1", "clinic_id": "c1", "price_usd": "10"}),
+        (3, {"test_id": "t2", "clinic_id": "c1", "price_usd": "12", "price_lrd": "2400"}),
+    ]
+
+
+def test_ndjson_rows_report_bad_lines_without_stopping():
+    content = "\n".join([
+        json.dumps({"test_id": "t1", "clinic_id": "c1", "price_usd": 10}),
+        "",
+        "{not json",
+        json.dumps({"test_id": "t2", "clinic_id": "c1", "price_usd": 12}),
+    ]).encode()
+    rows = list(read_pricing_rows(upload(content), PricingFileFormat.NDJSON))
+
+    assert [line_number for line_number, _ in rows] == [1, 3, 4]
+    assert isinstance(rows[1][1], json.JSONDecodeError)
+    assert rows[2][1]["test_id"] == "t2"
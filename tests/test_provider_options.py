@@ -0,0 +1,34 @@
+import asyncio
+import json
+from unittest import mock
+
+import server
+from server import Currency
+
+
+def provider(clinic_id, price_usd, price_lrd):
+    return {
+        "clinic_id": clinic_id, "name": f"Clinic {clinic_id}", "description": "Laboratory", "location": "Monrovia",
+        "phone": "+231-777-000000", "pricing_id": f"p-{clinic_id}", "price_usd": price_usd, "price_lrd": price_lrd
+    }
+
+
+def provider_order(currency):
+    # The view stores providers cheapest first in USD
+    view = {"providers": [provider("a", 10.0, 5000.0), provider("b", 20.0, None), provider("c", 30.0, 2000.0)]}
+    test_providers = mock.Mock(find_one=mock.AsyncMock(return_value=view))
+    server.catalog_cache.invalidate()
+    with mock.patch.object(server, "db", mock.Mock(test_providers=test_providers)), \
+            mock.patch.object(server, "get_lrd_rate", mock.AsyncMock(return_value=200.0)):
+        response = asyncio.run(server.get_test_provider_options("t1", currency, None))
+    server.catalog_cache.invalidate()
+    providers = json.loads(response.body)["providers"]
+    return [(option["clinic_id"], option["price_lrd"]) for option in providers]
+
+
+def test_usd_order_follows_the_view():
+    assert provider_order(Currency.USD) == [("a", 5000.0), ("b", 4000.0), ("c", 2000.0)]
+
+
+def test_lrd_order_uses_overrides_and_derived_prices():
+    assert provider_order(Currency.LRD) == [("c", 2000.0), ("b", 4000.0), ("a", 5000.0)]
@@ -0,0 +1,48 @@
+import asyncio
+import ipaddress
+from unittest import mock
+
+from starlette.requests import Request
+
+import server
+from server import InMemoryRateLimiter, get_client_ip
+
+
+def request(peer: str, forwarded_for: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "client": (peer, 40000), "headers": headers})
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    assert get_client_ip(request("10.0.0.7", "1.2.3.4")) == "10.0.0.7"
+    assert get_client_ip(request("127.0.0.1", "1.2.3.4")) == "1.2.3.4"
+
+
+def test_forwarded_for_is_walked_back_through_trusted_proxies():
+    trusted = [ipaddress.ip_network("10.0.0.0/8")]
+    with mock.patch.object(server, "AUTH_TRUSTED_PROXIES", trusted):
+        # The left-most entries are whatever the client sent; only the hop the ingress saw counts
+        assert get_client_ip(request("10.0.0.7", "6.6.6.6, 1.2.3.4, 10.0.0.5")) == "1.2.3.4"
+        assert get_client_ip(request("10.0.0.7")) == "10.0.0.7"
+
+
+def test_bucket_empties_then_reports_retry_after():
+    limiter = InMemoryRateLimiter(max_keys=10)
+
+    async def take_three():
+        return [await limiter.take("login:email:a@b.lr", 2, 2 / 60) for _ in range(3)]
+
+    results = asyncio.run(take_three())
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert 0 < results[2][1] <= 30
+
+
+def test_least_recently_used_buckets_are_dropped_at_the_cap():
+    limiter = InMemoryRateLimiter(max_keys=2)
+
+    async def take(*keys):
+        for key in keys:
+            await limiter.take(key, 5, 1)
+
+    asyncio.run(take("a", "b", "a", "c"))
+    assert list(limiter._buckets) == ["a", "c"]
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from server import attachment_disposition, parse_range_header
+
+
+def test_range_header_forms():
+    assert parse_range_header(None, 100) is None
+    assert parse_range_header("bytes=0-9", 100) == (0, 9)
+    assert parse_range_header("bytes=90-", 100) == (90, 99)
+    assert parse_range_header("bytes=-10", 100) == (90, 99)
+    assert parse_range_header("bytes=50-500", 100) == (50, 99)
+
+
+def test_unsupported_ranges_serve_the_whole_file():
+    assert parse_range_header("items=0-9", 100) is None
+    assert parse_range_header("bytes=0-9,20-29", 100) is None
+    assert parse_range_header("bytes=a-b", 100) is None
+
+
+def test_unsatisfiable_range_is_416():
+    with pytest.raises(HTTPException) as error:
+        parse_range_header("bytes=100-", 100)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_attachment_disposition_keeps_utf8_name():
+    assert attachment_disposition('lab "result".pdf') == (
+        "attachment; filename=\"lab _result_.pdf\"; filename*=UTF-8''lab%20%22result%22.pdf"
+    )
+    assert attachment_disposition("résultat.txt").startswith('attachment; filename="r_sultat.txt"')
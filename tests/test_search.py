@@ -0,0 +1,56 @@
+import asyncio
+
+from server import search_catalog
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+
+    def sort(self, *args):
+        self.calls.append(("sort", args))
+        return self
+
+    def skip(self, offset):
+        self.calls.append(("skip", offset))
+        return self
+
+    def limit(self, limit):
+        self.calls.append(("limit", limit))
+        return self
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.cursor = FakeCursor(documents)
+        self.filter = None
+
+    def find(self, filter, projection):
+        self.filter = filter
+        return self.cursor
+
+
+def test_text_search_is_ranked_by_score_and_pages_by_offset():
+    collection = FakeCollection([{"id": str(i)} for i in range(3)])
+    documents, next_offset = asyncio.run(search_catalog(collection, " malaria ", ["name"], 20, 2))
+    assert collection.filter == {"$text": {"$search": "malaria"}}
+    assert collection.cursor.calls[0] == ("sort", ([("score", {"$meta": "textScore"}), ("id", 1)],))
+    assert collection.cursor.calls[1:] == [("skip", 20), ("limit", 3)]
+    assert [document["id"] for document in documents] == ["0", "1"]
+    assert next_offset == 22
+
+
+def test_short_query_is_an_anchored_prefix_match():
+    collection = FakeCollection([{"id": "1"}])
+    documents, next_offset = asyncio.run(search_catalog(collection, "l.", ["name", "location"], 0, 20))
+    prefix = {"$regex": "^l\\.", "$options": "i"}
+    assert collection.filter == {"$or": [{"name": prefix}, {"location": prefix}]}
+    assert len(documents) == 1 and next_offset is None
+
+
+def test_blank_query_finds_nothing():
+    assert asyncio.run(search_catalog(FakeCollection([{"id": "1"}]), "  ", ["name"], 0, 20)) == ([], None)
@@ -0,0 +1,54 @@
+from server import Language, SuggestionIndex, search_tokens
+
+
+def build_index():
+    index = SuggestionIndex()
+    index.add("test", {"id": "t1", "name": "Malaria Rapid Test", "category": "Parasitology"})
+    index.add("test", {"id": "t2", "name": "Hémoglobine", "category": "Hematology"})
+    index.add("test", {"id": "t3", "name": "Stool Analysis", "category": "Malaria Screening"})
+    index.add("clinic", {"id": "c1", "name": "Sinkor Medical Center", "location": "Sinkor, Monrovia",
+                         "services": ["Malaria testing"]})
+    return index
+
+
+def ids(suggestions):
+    return [suggestion.id for suggestion in suggestions]
+
+
+def test_tokens_fold_accents_and_drop_elisions_and_stopwords():
+    assert search_tokens("L'Hémoglobine de l'enfant", Language.FR) == ["hemoglobine", "enfant"]
+    assert search_tokens("Test for a child", Language.EN) == ["test", "child"]
+
+
+def test_partial_last_word_is_kept_even_if_short_or_a_stopword():
+    assert search_tokens("malaria t", partial_last=True) == ["malaria", "t"]
+    assert search_tokens("analyse de", Language.FR, partial_last=True) == ["analyse", "de"]
+    assert search_tokens("analyse de ", Language.FR, partial_last=True) == ["analyse"]
+
+
+def test_name_hits_outrank_category_and_service_hits():
+    suggestions = build_index().suggest("malar", None, 10)
+    assert ids(suggestions) == ["t1", "c1", "t3"]
+    assert [suggestion.matched_field for suggestion in suggestions] == ["name", "services", "category"]
+
+
+def test_single_character_prefix_and_accent_folding():
+    assert ids(build_index().suggest("h", None, 10)) == ["t2"]
+    assert ids(build_index().suggest("hemo", None, 10)) == ["t2"]
+
+
+def test_every_word_must_match():
+    assert ids(build_index().suggest("sinkor med", None, 10)) == ["c1"]
+    assert build_index().suggest("sinkor stool", None, 10) == []
+
+
+def test_typos_fall_back_to_trigram_similarity():
+    assert "t1" in ids(build_index().suggest("maleria", None, 10))
+
+
+def test_removed_documents_are_no_longer_suggested():
+    index = build_index()
+    edits = index.edits
+    index.remove("test", "t1")
+    assert "t1" not in ids(index.suggest("malaria", None, 10))
+    assert index.edits == edits + 1
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import server
+
+
+def authenticate(user, revoked_user_ids=()):
+    """Resolve a version-0 admin token for user-1 against a users collection holding user"""
+    token = server.create_access_token({"sub": "user-1", "role": "admin", "clinic_id": None, "ver": 0})
+    revocations = server.TokenRevocations()
+    revocations.loaded_at = time.monotonic()
+    revocations.expires_at = {user_id: datetime.utcnow() + timedelta(minutes=5) for user_id in revoked_user_ids}
+    users = mock.Mock(find_one=mock.AsyncMock(return_value=user))
+    server.principal_cache.invalidate()
+    with mock.patch.object(server, "db", mock.Mock(users=users)), \
+            mock.patch.object(server, "token_revocations", revocations):
+        principal = asyncio.run(server.get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+    return principal, users.find_one
+
+
+def test_claims_are_trusted_for_unchanged_users():
+    principal, find_one = authenticate({"id": "user-1", "role": "admin", "token_version": 0})
+    assert principal.role == server.UserRole.ADMIN
+    find_one.assert_not_awaited()
+
+
+def test_revoked_user_is_reloaded_and_stale_version_refused():
+    with pytest.raises(HTTPException) as error:
+        authenticate({"id": "user-1", "role": "sub_admin", "token_version": 1}, ["user-1"])
+    assert error.value.status_code == 401
+
+
+def test_deleted_user_token_is_refused():
+    with pytest.raises(HTTPException) as error:
+        authenticate(None, ["user-1"])
+    assert error.value.status_code == 401
+
+
+def test_revoked_user_with_current_version_gets_fresh_role():
+    principal, find_one = authenticate({"id": "user-1", "role": "admin", "token_version": 0}, ["user-1"])
+    assert principal.token_version == 0
+    find_one.assert_awaited_once()